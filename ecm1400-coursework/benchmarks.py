@@ -0,0 +1,1036 @@
+import time
+import numpy as np
+
+
+def _timed(function, *args, **kwargs) -> tuple:
+    """
+    Runs a function once and measures its wall-clock time
+
+    Arguments:
+        function: function to run
+        *args, **kwargs: arguments passed to function
+    Returns:
+        result: return value of function
+        seconds (float): time taken
+    """
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def _legacy_label_bfs(mask:np.ndarray) -> np.ndarray:
+    """
+    Original breadth-first search from detect_connected_components (Algorithm 1, as per specification)
+    Kept as the baseline for bench_labelling(); the queue Q is grown with np.append and shrunk with np.delete
+    Reads pixels from a boolean mask rather than comparing RGB values, so it is somewhat faster than the original
+
+    Arguments:
+        mask (np.ndarray): 2D boolean array, True for pavement pixels
+    Returns:
+        MARK (np.ndarray): 2D array representing connected components
+    """
+    i,j = mask.shape
+    MARK = np.zeros((i,j))
+    R = 1
+    Q = np.empty(0)
+    for y in range(i):
+        for x in range(j):
+            if mask[y,x] and MARK[y,x] == 0:
+                MARK[y,x] = R
+                Q = np.append(Q, [y,x]).reshape(-1,2)
+                while np.size(Q) > 0:
+                    m,n = Q[0]
+                    neighbours = [      [min(m+1,i-1),   max(n-1,0)], [min(m+1,i-1),   n],  [min(m+1,i-1),  min(n+1,j-1)],
+                                        [m           ,   max(n-1,0)],                       [m           ,  min(n+1,j-1)],
+                                        [max(m-1,0)  ,   max(n-1,0)], [max(m-1,0)  ,   n],  [max(m-1,0)  ,  min(n+1,j-1)]   ]
+                    for pixel in neighbours:
+                        s,t = int(pixel[0]),int(pixel[1])
+                        if mask[s,t] and MARK[s,t] == 0:
+                            MARK[s,t] = R
+                            Q = np.append(Q, [s,t]).reshape(-1,2)
+                    Q = np.delete(Q, 0, axis = 0)
+                R = R + 1
+    return MARK
+
+def synthetic_road_mask(height:int, width:int, roads:int=None, seed:int=0) -> np.ndarray:
+    """
+    Generates a binary road map: random horizontal, vertical and diagonal lines (3 pixels wide) on a background
+
+    Arguments:
+        height (int): number of rows
+        width (int): number of columns
+        roads (int): number of lines, default = one per 20 pixels of the longest side
+        seed (int): random seed
+    Returns:
+        mask (np.ndarray): 2D boolean array, True for road pixels
+    """
+    rng = np.random.default_rng(seed)
+    roads = max(height, width) // 20 if roads is None else roads
+    mask = np.zeros((height, width), dtype=bool)
+    for _ in range(roads):
+        kind = rng.integers(3)
+        start = rng.integers(0, max(height, width))
+        length = rng.integers(1, max(height, width))
+        if kind == 0:                                                   # Horizontal road
+            y = start % height
+            x = rng.integers(0, width)
+            mask[y:y+3, x:x+length] = True
+        elif kind == 1:                                                 # Vertical road
+            x = start % width
+            y = rng.integers(0, height)
+            mask[y:y+length, x:x+3] = True
+        else:                                                           # Diagonal road
+            y0, x0 = rng.integers(0, height), rng.integers(0, width)
+            steps = np.arange(min(length, height - y0, width - x0))
+            for offset in range(3):
+                mask[y0 + steps, np.minimum(x0 + steps + offset, width - 1)] = True
+    return mask
+
+def bench_labelling(sizes:tuple=((250,250),(500,500),(1140,1053),(4000,4000),(8000,8000)), legacy_limit:int=1300000):
+    """
+    Benchmarks intelligence.label_components against the original breadth-first search on synthetic road maps
+
+    Arguments:
+        sizes (tuple): (height, width) of each synthetic map
+        legacy_limit (int): largest number of pixels the original search is run on
+    Outputs:
+        prints time taken by each implementation
+    """
+    import intelligence
+    print(f"{'size':>12} {'pixels':>11} {'runs':>10} {'original (s)':>13} {'scanline (s)':>13}")
+    for height, width in sizes:
+        mask = synthetic_road_mask(height, width)
+        MARK, fast = _timed(intelligence.label_components, mask)
+        runs = len(intelligence._find_runs(mask)[0])
+        if height * width <= legacy_limit:
+            legacy, slow = _timed(_legacy_label_bfs, mask)
+            assert np.array_equal(legacy, MARK), 'labels differ from the original implementation'
+            slow = f'{slow:.3f}'
+        else:
+            slow = '-'
+        print(f"{height:>5}x{width:<6} {height*width:>11} {runs:>10} {slow:>13} {fast:>13.3f}")
+
+def _legacy_top_k(MARK:np.ndarray, k:int) -> np.ndarray:
+    """
+    Original component ordering of detect_connected_components_sorted: one countvalue loop over the flattened MARK per label,
+    the original merge sort of the sizes (see: _legacy_sorted), then a search of the labels of each size, largest first
+
+    Arguments:
+        MARK (np.ndarray): 2D array representing connected components
+        k (int): number of components
+    Returns:
+        labels (np.ndarray): labels of the k largest components, in decreasing order of pixel size
+    """
+    R = int(np.max(MARK))
+    cdict = {}
+    component_array = MARK.flatten().tolist()
+    for index in range(1,R+1):
+        occurrence = 0
+        for i in component_array:
+            if index == i:
+                occurrence = occurrence + 1
+        cdict.update({index:occurrence})
+    oc_array = _legacy_sorted(list(cdict.values()))
+    oc_array.reverse()
+    labels = []
+    for item in oc_array:
+        if len(labels) >= k:
+            break
+        if item > 0 and (not labels or cdict[labels[-1]] != item):   # Each size is searched once (the original wrote repeats again)
+            labels += [key for key,value in cdict.items() if value == item]
+    return np.array(labels[:k], dtype=np.int64)
+
+def bench_top_k(components:tuple=(1000,10000,100000,1000000), k:int=10, pixels:int=16000000,
+                legacy_components:tuple=(10,100,1000), legacy_pixels:int=10000):
+    """
+    Benchmarks intelligence.top_k_components against the original per-label counting and merge sort (see: _legacy_top_k)
+    on small label arrays, then against a full sort of every component size on large ones. Both large-array methods count
+    pixels with np.bincount first, so its time is shown on its own: the selection is the rest
+
+    Arguments:
+        components (tuple): number of components in each large synthetic label array
+        k (int): number of components selected
+        pixels (int): number of pixels in each large synthetic label array
+        legacy_components (tuple): number of components in each small synthetic label array
+        legacy_pixels (int): number of pixels in each small synthetic label array (the original loop is O(pixels x components))
+    Outputs:
+        prints time taken by each method
+    """
+    import intelligence
+    rng = np.random.default_rng(0)
+    print(f'{legacy_pixels} pixels')
+    print(f"{'components':>11} {'original (s)':>13} {'top-k (s)':>10}")
+    for count in legacy_components:
+        MARK = rng.integers(1, count + 1, size=legacy_pixels, dtype=np.int32).reshape(100, -1)
+        expected, slow = _timed(_legacy_top_k, MARK, k)
+        chosen, fast = _timed(intelligence.top_k_components, MARK, k)
+        assert np.array_equal(expected, chosen), 'top-k differs from the original'
+        print(f"{count:>11} {slow:>13.3f} {fast:>10.4f}")
+
+    print(f'{pixels} pixels')
+    print(f"{'components':>11} {'bincount (s)':>13} {'full sort (s)':>14} {'top-k (s)':>10}")
+    for count in components:
+        MARK = rng.integers(1, count + 1, size=pixels, dtype=np.int32).reshape(4000, -1)
+        sizes, counting = _timed(lambda: np.bincount(MARK[MARK > 0]))
+
+        def full_sort():
+            sizes = np.bincount(MARK[MARK > 0])
+            labels = np.flatnonzero(sizes)
+            return labels[np.lexsort((labels, -sizes[labels]))][:k]
+
+        expected, slow = _timed(full_sort)
+        chosen, fast = _timed(intelligence.top_k_components, MARK, k)
+        assert np.array_equal(expected, chosen), 'top-k differs from full sort'
+        print(f"{count:>11} {counting:>13.3f} {slow:>14.3f} {fast:>10.3f}")
+
+def _legacy_find_pixels(map_filename:str, colour:str, upper_threshold=100, lower_threshold=50) -> np.ndarray:
+    """
+    Original find_red_pixels / find_cyan_pixels, without saving the image: decodes the file as float (matplotlib plugin),
+    scales it to 0-255, thresholds it and marks the colour white and the rest black
+
+    Arguments:
+        map_filename (str): path to image file
+        colour (str): 'red' or 'cyan'
+        upper_threshold (int): default = 100
+        lower_threshold (int): default = 50
+    Returns:
+        map_array (np.ndarray): 3D uint8 array, white where the colour was found (and where the map was already white)
+    """
+    from skimage import io
+    map_array = io.imread(map_filename, plugin='matplotlib')
+    map_array = map_array[:,:,:3] * 255
+    upper = map_array[:,:,0] > upper_threshold if colour == 'red' else map_array[:,:,0] < lower_threshold
+    lower = (map_array[:,:,1] < lower_threshold) & (map_array[:,:,2] < lower_threshold) if colour == 'red' else \
+            (map_array[:,:,1] > upper_threshold) & (map_array[:,:,2] > upper_threshold)
+    map_array[np.where(upper & lower)] = [255, 255, 255]
+    map_array[np.any(map_array != [255, 255, 255], axis=2)] = [0, 0, 0]
+    return map_array.astype(np.uint8)
+
+def bench_classify(tiles:tuple=(1,2,4,8)):
+    """
+    Benchmarks intelligence.classify_pixels (red and cyan in one pass) against the original find_red_pixels and
+    find_cyan_pixels, which decoded the image file once per colour (see: _legacy_find_pixels). Both read the same PNG file:
+    data/map.png tiled into larger images. Saving the output images is left out of both
+
+    Arguments:
+        tiles (tuple): number of copies of the map along each side
+    Outputs:
+        prints time taken by each method
+    """
+    import os, tempfile
+    import intelligence
+    from skimage import io
+    base = intelligence._read_rgb('data/map.png')
+    print(f"{'pixels':>11} {'original (s)':>13} {'fused (s)':>10}")
+    with tempfile.TemporaryDirectory() as folder:
+        for n in tiles:
+            image = np.tile(base, (n, n, 1))
+            filename = os.path.join(folder, 'map.png')
+            io.imsave(filename, image, plugin='imageio', check_contrast=False)
+            white = np.all(image == 255, axis=2)                     # The original left white pixels white
+
+            def original():
+                return {name: _legacy_find_pixels(filename, name)[:,:,0] == 255 for name in intelligence.COLOUR_RULES}
+
+            expected, slow = _timed(original)
+            masks, fast = _timed(intelligence.classify_pixels, filename)
+            assert all(np.array_equal(expected[name] & ~white, masks[name] & ~white) for name in masks), 'masks differ'
+            print(f"{image.shape[0]*image.shape[1]:>11} {slow:>13.3f} {fast:>10.3f}")
+
+def bench_tiled(heights:tuple=(2000,4000,8000), width:int=4000, strip_rows:int=256):
+    """
+    Benchmarks peak memory and time of intelligence.component_stats_tiled on memory-mapped .npy images of growing height,
+    against labelling the whole image in memory. Peak memory is measured with tracemalloc
+
+    Arguments:
+        heights (tuple): number of rows of each synthetic image
+        width (int): number of columns of each synthetic image
+        strip_rows (int): rows per strip in tiled mode
+    Outputs:
+        prints time taken and peak memory of each mode
+    """
+    import os, tempfile, tracemalloc
+    import intelligence
+
+    def peak(function, *args):
+        tracemalloc.start()
+        result, seconds = _timed(function, *args)
+        memory = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+        return result, seconds, memory
+
+    def in_memory(filename):
+        image = np.load(filename)
+        return intelligence.component_stats(intelligence.label_components(intelligence._pavement_mask(image)))
+
+    print(f"{'size':>12} {'in-memory (s)':>14} {'peak (MiB)':>11} {'tiled (s)':>10} {'peak (MiB)':>11}")
+    with tempfile.TemporaryDirectory() as folder:
+        for height in heights:
+            filename = os.path.join(folder, 'map.npy')
+            np.save(filename, intelligence._mask_image(synthetic_road_mask(height, width)))
+            expected, slow, slow_memory = peak(in_memory, filename)
+            table, fast, fast_memory = peak(intelligence.component_stats_tiled, filename, None, strip_rows)
+            assert table.equals(expected), 'tables differ'
+            print(f"{height:>5}x{width:<6} {slow:>14.3f} {slow_memory:>11.1f} {fast:>10.3f} {fast_memory:>11.1f}")
+
+def bench_parallel(size:int=10000, workers:tuple=(1,2,4,8), processes:bool=False):
+    """
+    Benchmarks the scaling of intelligence.label_components with the number of workers on a synthetic square road map
+    Speedup is limited by the number of cores available (os.cpu_count)
+
+    Arguments:
+        size (int): number of rows and columns of the synthetic map
+        workers (tuple): numbers of workers to compare
+        processes (bool): use a process pool instead of a thread pool
+    Outputs:
+        prints time taken and speedup for each number of workers
+    """
+    import os
+    import intelligence
+    mask = synthetic_road_mask(size, size)
+    print(f'{size}x{size} map, {os.cpu_count()} cores available')
+    print(f"{'workers':>8} {'time (s)':>9} {'speedup':>8}")
+    expected, baseline = None, None
+    for count in workers:
+        MARK, seconds = _timed(intelligence.label_components, mask, count, processes)
+        if expected is None:
+            expected, baseline = MARK, seconds
+        assert np.array_equal(expected, MARK), 'labels differ between worker counts'
+        print(f"{count:>8} {seconds:>9.3f} {baseline/seconds:>8.2f}")
+
+def bench_import(repeats:int=5):
+    """
+    Benchmarks reporting.import_data parsing the CSVs against loading the binary cache
+
+    Arguments:
+        repeats (int): number of timed loads of each kind
+    Outputs:
+        prints the best time of each kind
+    """
+    import reporting
+    parse = min(_timed(reporting.import_data, False)[1] for _ in range(repeats))
+    reporting.import_data()                                             # Builds the cache
+    cached = min(_timed(reporting.import_data)[1] for _ in range(repeats))
+    print(f"{'parse CSVs (s)':>15} {'load cache (s)':>15}")
+    print(f"{parse:>15.4f} {cached:>15.4f}")
+
+def _legacy_parse_data(dataframe):
+    """
+    Original reporting.parse_data, kept as the baseline for bench_parse (maps 24:00:00 to 00:00:00 of the same day)
+
+    Arguments:
+        dataframe: original dataframe
+    Returns:
+        dataframe: modified dataframe
+    """
+    import pandas as pd
+    dataframe = dataframe.replace('No data',np.nan)
+    dataframe.no = dataframe.no.astype(float)
+    dataframe.pm10 = dataframe.pm10.astype(float)
+    dataframe.pm25 = dataframe.pm25.astype(float)
+    dataframe.time = dataframe.time.replace('24:00:00', '00:00:00')
+    dataframe.loc[:,'datetime'] = pd.to_datetime(dataframe.date + ' ' + dataframe.time, format='%Y-%m-%d %H:%M:%S')
+    dataframe = dataframe.drop(columns=['date','time'])
+    dataframe = dataframe.set_index('datetime')
+    return dataframe
+
+def synthetic_station_csv(filename:str, years:int=1, missing:float=0.05, seed:int=0):
+    """
+    Writes a station CSV in the same format as data/Pollution-*.csv: hourly readings from 01:00 to 24:00 each day,
+    with a fraction of 'No data' entries
+
+    Arguments:
+        filename (str): path to CSV
+        years (int): number of years (of 365 days) of hourly readings, starting 2000-01-01
+        missing (float): fraction of readings without data
+        seed (int): random seed
+    Outputs:
+        CSV file with date, time, no, pm10 and pm25 columns
+    """
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    count = years * 365 * 24
+    hours = np.arange(count)
+    days = pd.date_range('2000-01-01', periods=count // 24 + 1, freq='D').strftime('%Y-%m-%d').to_numpy()
+    times = np.array([f'{hour:02d}:00:00' for hour in range(1, 25)])
+    frame = pd.DataFrame({'date': days[hours // 24], 'time': times[hours % 24]})
+    for pollutant, scale in (('no', 5.0), ('pm10', 15.0), ('pm25', 10.0)):
+        values = np.round(rng.gamma(2.0, scale, count), 3)
+        values[rng.random(count) < missing] = np.nan
+        frame[pollutant] = values
+    frame.to_csv(filename, index=False, na_rep='No data')
+
+def bench_parse(years:int=10, stations:int=10):
+    """
+    Benchmarks reading and parsing station CSVs with reporting.read_station/parse_data against the original parse_data
+
+    Arguments:
+        years (int): years of hourly readings per station
+        stations (int): number of synthetic station files
+    Outputs:
+        prints time taken by each implementation
+    """
+    import os, tempfile
+    import pandas as pd
+    import reporting
+    with tempfile.TemporaryDirectory() as folder:
+        files = [os.path.join(folder, f'Pollution-Station {n}.csv') for n in range(stations)]
+        for seed, name in enumerate(files):
+            synthetic_station_csv(name, years, seed=seed)
+        legacy, slow = _timed(lambda: [_legacy_parse_data(pd.read_csv(name)) for name in files])
+        parsed, fast = _timed(lambda: [reporting.parse_data(reporting.read_station(name)) for name in files])
+        for old, new in zip(legacy, parsed):
+            assert np.allclose(old.to_numpy(), new.to_numpy(), equal_nan=True), 'values differ'
+    print(f'{stations} stations x {years} years = {stations * years * 8760} rows')
+    print(f"{'original (s)':>13} {'rewritten (s)':>14}")
+    print(f"{slow:>13.3f} {fast:>14.3f}")
+
+def bench_aggregates(repeats:int=3, append_days:int=30):
+    """
+    Benchmarks serving every station x pollutant x report from reporting.aggregates against resampling the data for each call,
+    then adding the last append_days of data with reporting.append_rows against rebuilding the aggregates (checking both agree)
+
+    Arguments:
+        repeats (int): number of times every report is requested
+        append_days (int): days of data appended
+    Outputs:
+        prints time taken by each method
+    """
+    import pandas as pd
+    import reporting
+    data = reporting.import_data()
+    legacy = {
+        'daily_average': lambda query: query.resample('D').mean(),
+        'daily_median': lambda query: query.resample('D').median(),
+        'hourly_average': lambda query: query.groupby([query.index.hour]).mean(),
+        'monthly_average': lambda query: query.resample('M').mean(),
+    }
+    requests = [(report, station, pollutant) for report in legacy for station in reporting.STATION_FILES for pollutant in reporting.POLLUTANTS] * repeats
+
+    def resample_each():
+        return [legacy[report](reporting._station(data, station))[pollutant].to_numpy() for report, station, pollutant in requests]
+
+    def from_aggregates():
+        reporting.clear_aggregates()
+        return [getattr(reporting, report)(data, station, pollutant) for report, station, pollutant in requests]
+
+    expected, slow = _timed(resample_each)
+    served, fast = _timed(from_aggregates)
+    assert all(np.allclose(a, b, equal_nan=True) for a, b in zip(expected, served)), 'reports differ'
+    print(f'{len(requests)} reports')
+    print(f"{'resample each (s)':>18} {'aggregates (s)':>15}")
+    print(f"{slow:>18.3f} {fast:>15.3f}")
+
+    cutoff = data.index.get_level_values('datetime')[-1] - pd.Timedelta(days=append_days)       # Last days arrive later (see: reporting.append_rows)
+    late = data.index.get_level_values('datetime') > cutoff
+    head, tail = data[~late], data[late]
+    reporting.clear_aggregates()
+    reporting.daily_average(head, requests[0][1], requests[0][2])
+    combined, append = _timed(reporting.append_rows, head, tail)
+    rebuilt, rebuild = _timed(reporting.build_aggregates, combined)
+    appended = reporting.aggregates(combined)
+    for station in rebuilt:
+        for name, table in rebuilt[station].items():
+            assert table.index.equals(appended[station][name].index), 'append differs from rebuild'
+            assert np.allclose(appended[station][name].to_numpy(float), table.to_numpy(float), equal_nan=True), 'append differs from rebuild'
+    print(f'append {late.sum()} rows ({append_days} days)')
+    print(f"{'rebuild (s)':>18} {'append (s)':>15}")
+    print(f"{rebuild:>18.3f} {append:>15.3f}")
+
+def bench_stream(years:int=10, stations:int=5, chunksize:int=50000):
+    """
+    Benchmarks reporting.stream_aggregates against loading every station CSV and running reporting.build_aggregates,
+    comparing time taken and peak memory traced while building
+
+    Arguments:
+        years (int): years of hourly readings per station
+        stations (int): number of synthetic station files
+        chunksize (int): rows read at a time when streaming
+    Outputs:
+        prints time taken and peak memory of each method
+    """
+    import os, tempfile, tracemalloc
+    import pandas as pd
+    import reporting
+
+    def traced(function, *args, **kwargs):
+        tracemalloc.start()
+        result, elapsed = _timed(function, *args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return result, elapsed, peak / 2**20
+
+    def load_all(pattern):
+        import glob
+        frames = {reporting._station_name(name): reporting.parse_data(reporting.read_station(name)) for name in sorted(glob.glob(pattern))}
+        return reporting.build_aggregates(pd.concat(frames, names=['station']))
+
+    with tempfile.TemporaryDirectory() as folder:
+        for seed in range(stations):
+            synthetic_station_csv(os.path.join(folder, f'Pollution-London Station {seed}.csv'), years, seed=seed)
+        pattern = os.path.join(folder, 'Pollution-*.csv')
+        full, slow, full_peak = traced(load_all, pattern)
+        streamed, fast, stream_peak = traced(reporting.stream_aggregates, pattern, chunksize)
+    for station in full:
+        for report in full[station]:
+            assert np.allclose(full[station][report].to_numpy(), streamed[station][report].to_numpy(), equal_nan=True), 'aggregates differ'
+    print(f'{stations} stations x {years} years = {stations * years * 8760} rows, chunks of {chunksize}')
+    print(f"{'method':>8} {'time (s)':>9} {'peak (MiB)':>11}")
+    print(f"{'full':>8} {slow:>9.3f} {full_peak:>11.1f}")
+    print(f"{'stream':>8} {fast:>9.3f} {stream_peak:>11.1f}")
+
+def bench_quantiles(years:int=10, alphas:tuple=(0.05, 0.01, 0.001), freqs:tuple=('D', 'M')):
+    """
+    Benchmarks reporting.approximate_quantiles against exact pandas quantiles (resample + quantile) for p50, p90 and p99,
+    reporting time taken and the largest relative error for each alpha
+
+    Arguments:
+        years (int): years of hourly readings of the synthetic station
+        alphas (tuple): relative accuracies of the sketches
+        freqs (tuple): period frequencies
+    Outputs:
+        prints time taken and largest relative error of each method
+    """
+    import os, tempfile
+    import pandas as pd
+    import reporting
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, 'Pollution-Station.csv')
+        synthetic_station_csv(filename, years)
+        data = pd.concat({'Station': reporting.parse_data(reporting.read_station(filename))}, names=['station'])
+    quantiles = (0.5, 0.9, 0.99)
+    series = reporting._station(data, 'Station')['pm10']
+    print(f'{years} years = {len(series)} readings, quantiles {quantiles}')
+    print(f"{'freq':>5} {'method':>14} {'time (s)':>9} {'max rel err':>12}")
+    for freq in freqs:
+        exact, slow = _timed(lambda: series.resample(freq).quantile(list(quantiles)).unstack().to_numpy())
+        print(f"{freq:>5} {'pandas':>14} {slow:>9.3f} {0:>12.2e}")
+        for alpha in alphas:
+            table, fast = _timed(reporting.approximate_quantiles, data, 'Station', 'pm10', quantiles, freq, alpha=alpha)
+            error = np.nanmax(np.abs(table.to_numpy() - exact) / np.abs(exact))
+            print(f"{freq:>5} {f'alpha={alpha:g}':>14} {fast:>9.3f} {error:>12.2e}")
+
+def bench_peaks(days:int=365):
+    """
+    Benchmarks reporting.peak_hours (one call for every station, pollutant and day) against calling the original
+    peak_hour_date once per station, pollutant and day
+
+    Arguments:
+        days (int): number of days from the start of the record
+    Outputs:
+        prints time taken by each method
+    """
+    import pandas as pd
+    import reporting
+    data = reporting.import_data()
+    dates = pd.date_range('2021-01-01', periods=days).strftime('%Y-%m-%d')
+
+    def legacy_peak_hour_date(date, monitoring_station, pollutant):
+        date_query = reporting._station(data, monitoring_station).loc[date]
+        return (str(date_query[pollutant].argmax() + 1).zfill(2) + ':00', date_query[pollutant].max())
+
+    calls = [(date, station, pollutant) for station in reporting.STATION_FILES for pollutant in reporting.POLLUTANTS for date in dates]
+    legacy, slow = _timed(lambda: [legacy_peak_hour_date(*call) for call in calls])
+    peaks, fast = _timed(reporting.peak_hours, data, dates)
+    values = [peaks.loc[(station, pd.Timestamp(date)), (pollutant, 'value')] for date, station, pollutant in calls]
+    assert np.allclose([peak for _, peak in legacy], values, equal_nan=True), 'peaks differ'
+    print(f'{len(calls)} station x pollutant x day peaks')
+    print(f"{'per call (s)':>13} {'batch (s)':>10}")
+    print(f"{slow:>13.3f} {fast:>10.3f}")
+
+def synthetic_station_frame(stations:int, years:int, missing:float=0.05, seed:int=0):
+    """
+    Builds time-indexed pollutant data in the same layout as reporting.import_data for many synthetic stations
+
+    Arguments:
+        stations (int): number of stations
+        years (int): number of years (of 365 days) of hourly readings per station, starting 2000-01-01 01:00
+        missing (float): fraction of readings without data
+        seed (int): random seed
+    Returns:
+        data (DataFrame): indexed by (station, datetime), with no, pm10 and pm25 columns
+    """
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    count = years * 365 * 24
+    times = pd.date_range('2000-01-01 01:00', periods=count, freq='h')
+    index = pd.MultiIndex.from_product([[f'Station {n}' for n in range(stations)], times], names=['station', 'datetime'])
+    columns = {}
+    for pollutant, scale in (('no', 5.0), ('pm10', 15.0), ('pm25', 10.0)):
+        values = rng.gamma(2.0, scale, len(index))
+        values[rng.random(len(index)) < missing] = np.nan
+        columns[pollutant] = values
+    return pd.DataFrame(columns, index=index)
+
+def bench_rolling(stations:int=100, years:int=10, hours:tuple=(8, 24)):
+    """
+    Benchmarks reporting.rolling_means against pandas grouped rolling means, and times reporting.exceedances
+
+    Arguments:
+        stations (int): number of synthetic stations
+        years (int): years of hourly readings per station
+        hours (tuple): window lengths
+    Outputs:
+        prints time taken by each method
+    """
+    import reporting
+    data = synthetic_station_frame(stations, years)
+    print(f'{stations} stations x {years} years = {len(data)} rows')
+    print(f"{'window':>7} {'pandas (s)':>11} {'cumsum (s)':>11}")
+    for window in hours:
+        minimum = int(np.ceil(0.75 * window))
+        expected, slow = _timed(lambda: data.groupby(level='station').rolling(window, min_periods=minimum).mean())
+        means, fast = _timed(reporting.rolling_means, data, window)
+        assert np.allclose(expected.to_numpy(), means.to_numpy(), equal_nan=True), 'means differ'
+        del expected, means
+        print(f"{f'{window}h':>7} {slow:>11.3f} {fast:>11.3f}")
+    table, elapsed = _timed(reporting.exceedances, data)
+    print(f'exceedances of {list(reporting.LIMIT_VALUES)} for all stations: {elapsed:.3f} s')
+
+def bench_quality(stations:int=20, years:int=10, limit:int=6):
+    """
+    Benchmarks reporting.missing_profile and reporting.fill_gaps (in place, all stations) against per-station pandas
+    equivalents (isna counts, and ffill / interpolate returning a filled copy of every station in turn). The isna counts
+    do not find gap runs or absent hours, so missing_profile does more work than its baseline
+
+    Arguments:
+        stations (int): number of synthetic stations
+        years (int): years of hourly readings per station
+        limit (int): hours limit of the fills
+    Outputs:
+        prints time taken by each method
+    """
+    import reporting
+    data = synthetic_station_frame(stations, years)
+    print(f'{stations} stations x {years} years = {len(data)} rows')
+    print(f"{'operation':>12} {'pandas (s)':>11} {'engine (s)':>11}")
+    per_station = lambda function: {station: function(data.loc[station]) for station in data.index.levels[0]}
+    _, slow = _timed(per_station, lambda frame: frame.isna().sum())
+    _, fast = _timed(reporting.missing_profile, data)
+    print(f"{'profile':>12} {slow:>11.3f} {fast:>11.3f}")
+    for method, legacy in (('ffill', lambda frame: frame.ffill(limit=limit)),
+                           ('interpolate', lambda frame: frame.interpolate(method='time', limit_area='inside'))):
+        _, slow = _timed(per_station, legacy)
+        target = data.copy()
+        _, fast = _timed(reporting.fill_gaps, target, method, None if method == 'interpolate' else limit)
+        print(f"{method:>12} {slow:>11.3f} {fast:>11.3f}")
+
+def _legacy_stats(values:list) -> tuple:
+    """
+    Original utils.sumvalues, maxvalue, minvalue and meannvalue: a type check and a Python loop for each statistic
+
+    Arguments:
+        values (list): list of numbers
+    Returns:
+        stats (tuple): sum, index of largest, index of smallest, mean
+    """
+    results = []
+    for statistic in ('sum', 'max', 'min', 'mean'):
+        if not all(type(n) in (int, float) for n in values):
+            raise TypeError('Non-numerical elements found in list')
+        if statistic in ('sum', 'mean'):
+            total = 0
+            for i in values:
+                total = total + i
+            results.append(total if statistic == 'sum' else total / len(values))
+        else:
+            index, best = 0, values[0]
+            for i in range(len(values)):
+                if (values[i] > best) if statistic == 'max' else (values[i] < best):
+                    index, best = i, values[i]
+            results.append(index)
+    return tuple(results)
+
+def bench_stats(sizes:tuple=(10**6, 10**7, 10**8), list_limit:int=10**7, legacy_limit:int=10**6):
+    """
+    Benchmarks utils.summary_stats on ndarrays, array.array and lists against the original utils functions on lists
+
+    Arguments:
+        sizes (tuple): numbers of elements
+        list_limit (int): largest size to build as a list / array.array (a list of 10^8 floats needs several GB)
+        legacy_limit (int): largest size to run the original functions on
+    Outputs:
+        prints time taken for sum, max, min and mean of each input type
+    """
+    import array
+    import utils
+    rng = np.random.default_rng(0)
+    print(f"{'n':>11} {'ndarray (s)':>12} {'array (s)':>10} {'list (s)':>9} {'original (s)':>13}")
+    for n in sizes:
+        values = rng.random(n)
+        stats, fast = _timed(utils.summary_stats, values)
+        buffer_time = list_time = legacy_time = float('nan')
+        if n <= list_limit:
+            _, buffer_time = _timed(utils.summary_stats, array.array('d', values))
+            as_list = values.tolist()
+            _, list_time = _timed(utils.summary_stats, as_list)
+            if n <= legacy_limit:
+                legacy, legacy_time = _timed(_legacy_stats, as_list)
+                assert legacy[1:3] == (stats['argmax'], stats['argmin']) and np.isclose(legacy[0], stats['sum']), 'stats differ'
+            del as_list
+        print(f"{n:>11} {fast:>12.4f} {buffer_time:>10.4f} {list_time:>9.4f} {legacy_time:>13.4f}")
+
+def _legacy_sorted(values:list) -> list:
+    """
+    Original utils.sorted: recursive merge sort copying the left and right halves at every level
+
+    Arguments:
+        values (list): list of elements
+    Returns:
+        values (list): sorted list
+    """
+    if len(values) > 1:
+        centre = len(values) // 2
+        left = values[:centre]
+        right = values[centre:]
+        _legacy_sorted(left)
+        _legacy_sorted(right)
+        i = j = k = 0
+        while i < len(left) and j < len(right):
+            if left[i] < right[j]:
+                values[k] = left[i]
+                i = i + 1
+            else:
+                values[k] = right[j]
+                j = j + 1
+            k = k + 1
+        while i < len(left):
+            values[k] = left[i]
+            i = i + 1
+            k = k + 1
+        while j < len(right):
+            values[k] = right[j]
+            j = j + 1
+            k = k + 1
+    return values
+
+def bench_sort(sizes:tuple=(10**4, 10**5, 10**6, 10**7), python_limit:int=10**6, k:int=10):
+    """
+    Benchmarks utils.mergesort (lists and NumPy arrays) and utils.nlargest against the original utils.sorted
+
+    Arguments:
+        sizes (tuple): numbers of elements
+        python_limit (int): largest size to sort as a list (pure Python sorts of 10^7 elements take minutes)
+        k (int): number of elements for nlargest
+    Outputs:
+        prints time taken by each method
+    """
+    import utils
+    rng = np.random.default_rng(0)
+    print(f"{'n':>10} {'original (s)':>13} {'list (s)':>9} {'ndarray (s)':>12} {'nlargest (s)':>13}")
+    for n in sizes:
+        values = rng.random(n)
+        legacy_time = list_time = float('nan')
+        if n <= python_limit:
+            expected, legacy_time = _timed(_legacy_sorted, values.tolist())
+            result, list_time = _timed(utils.mergesort, values.tolist())
+            assert result == expected, 'sorts differ'
+        array = values.copy()
+        _, array_time = _timed(utils.mergesort, array)
+        top, top_time = _timed(utils.nlargest, values, k)
+        assert top == array[::-1][:k].tolist(), 'nlargest differs'
+        print(f"{n:>10} {legacy_time:>13.3f} {list_time:>9.3f} {array_time:>12.4f} {top_time:>13.4f}")
+
+def bench_histogram(size:int=10**6, labels:tuple=(10, 100, 1000), legacy_limit:int=10**8):
+    """
+    Benchmarks utils.histogram (one pass for every label) against calling the original utils.countvalue once per label,
+    as the original intelligence module did when sizing connected components
+
+    Arguments:
+        size (int): number of elements
+        labels (tuple): numbers of distinct labels
+        legacy_limit (int): largest size x labels to run the original countvalue loop on
+    Outputs:
+        prints time taken by each method
+    """
+    import utils
+    rng = np.random.default_rng(0)
+
+    def legacy_counts(values, targets):
+        counts = {}
+        for x in targets:
+            occurs = 0
+            for i in values:
+                if x == i:
+                    occurs = occurs + 1
+            counts[x] = occurs
+        return counts
+
+    print(f'{size} elements')
+    print(f"{'labels':>7} {'original (s)':>13} {'list (s)':>9} {'ndarray (s)':>12}")
+    for count in labels:
+        values = rng.integers(0, count, size)
+        as_list = values.tolist()
+        expected, legacy_time = None, float('nan')
+        if size * count <= legacy_limit:
+            expected, legacy_time = _timed(legacy_counts, as_list, range(count))
+        counts, list_time = _timed(utils.histogram, as_list)
+        array_counts, array_time = _timed(utils.histogram, values)
+        assert counts == array_counts and expected in (None, counts), 'counts differ'
+        print(f"{count:>7} {legacy_time:>13.3f} {list_time:>9.4f} {array_time:>12.4f}")
+
+def synthetic_api_payload(site_code:str, species_code:str, start_date, end_date, missing:float=0.05, seed:int=0) -> dict:
+    """
+    Builds an AirQuality API response (as returned by monitoring.get_live_data_from_api) with hourly readings
+
+    Arguments:
+        site_code (str): site code
+        species_code (str): species code
+        start_date, end_date (date | str): first day and day after the last day
+        missing (float): fraction of readings with an empty value
+        seed (int): random seed
+    Returns:
+        json_data (dict): json dictionary
+    """
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(str(start_date), str(end_date), freq='h', inclusive='left').strftime('%Y-%m-%d %H:%M:%S')
+    values = np.round(rng.gamma(2.0, 10.0, len(times)), 1).astype(str)
+    values[rng.random(len(times)) < missing] = ''
+    return {'RawAQData': {'@SiteCode': site_code, '@SpeciesCode': species_code,
+                          'Data': [{'@MeasurementDateGMT': time, '@Value': value} for time, value in zip(times.tolist(), values.tolist())]}}
+
+def stub_api_server(delay:float=0.05, failures:int=0):
+    """
+    Starts a local AirQuality API stand-in on a free port, answering every SiteSpecies request with a synthetic payload
+    (see: synthetic_api_payload, built once per address) after a delay. The first `failures` requests of each address get a 503 response
+
+    Arguments:
+        delay (float): seconds to wait before each response
+        failures (int): failed responses per address before it succeeds
+    Returns:
+        server (ThreadingHTTPServer): running server; its base_url attribute is the address to pass as base_url,
+                                      call server.shutdown() to stop it
+    """
+    import json, threading, time
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    attempts, bodies = {}, {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(delay)
+            attempts[self.path] = attempts.get(self.path, 0) + 1
+            if attempts[self.path] <= failures:
+                self.send_response(503)
+                self.end_headers()
+                return
+            if self.path not in bodies:
+                fields = dict(part.split('=', 1) for part in self.path.split('/') if '=' in part)
+                bodies[self.path] = json.dumps(synthetic_api_payload(fields['SiteCode'], fields['SpeciesCode'], fields['StartDate'], fields['EndDate'])).encode()
+            body = bodies[self.path]
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        request_queue_size = 128                                    # Accepts many simultaneous connections
+
+    server = Server(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def bench_fetch(sites:int=12, species:tuple=('NO2', 'PM10'), days:int=90, delay:float=0.05, workers:tuple=(1, 8, 32)):
+    """
+    Benchmarks monitoring.fetch_many against one monitoring.get_live_data_from_api call per site and species,
+    using a local stub server (see: stub_api_server) that takes delay seconds per request
+
+    Arguments:
+        sites (int): number of sites
+        species (tuple): species codes
+        days (int): days requested per site and species (31 days per request when chunked)
+        delay (float): server time per request in seconds
+        workers (tuple): concurrency limits of fetch_many
+    Outputs:
+        prints time taken by each method
+    """
+    import datetime
+    import monitoring
+    server = stub_api_server(delay)
+    start = datetime.date(2022, 1, 1)
+    end = start + datetime.timedelta(days=days)
+    queries = [(f'S{n:02d}', code, start, end) for n in range(sites) for code in species]
+    try:
+        monitoring.fetch_many(queries, server.base_url, max(workers), chunk_days=days)    # Builds every response once, untimed
+        monitoring.fetch_many(queries, server.base_url, max(workers))
+        _, slow = _timed(lambda: [monitoring.get_live_data_from_api(*query, base_url=server.base_url) for query in queries])
+        print(f'{len(queries)} site x species queries of {days} days, {delay * 1000:.0f} ms per request')
+        print(f"{'method':>16} {'time (s)':>9}")
+        print(f"{'one call each':>16} {slow:>9.3f}")
+        for count in workers:
+            payloads, fast = _timed(monitoring.fetch_many, queries, server.base_url, count)
+            assert sum(len(payload['RawAQData']['Data']) for chunks in payloads.values() for payload in chunks) == len(queries) * days * 24, 'readings missing'
+            print(f"{f'{count} workers':>16} {fast:>9.3f}")
+    finally:
+        server.shutdown()
+
+def bench_api_cache(days:int=31, extend:int=7, delay:float=0.05):
+    """
+    Benchmarks monitoring.cached_data (cold, re-viewed and extended windows) against downloading and parsing the whole
+    window each time with monitoring.get_live_data_from_api and monitoring.parse_json, using a local stub server
+
+    Arguments:
+        days (int): days in the window
+        extend (int): days the window is extended by
+        delay (float): server time per request in seconds
+    Outputs:
+        prints time taken by each step
+    """
+    import datetime, tempfile
+    import monitoring
+    server = stub_api_server(delay)
+    start = datetime.date(2022, 1, 1)
+    end, extended = start + datetime.timedelta(days=days), start + datetime.timedelta(days=days + extend)
+    download = lambda last: monitoring.parse_json(monitoring.get_live_data_from_api('MR8', 'PM10', start, last, base_url=server.base_url))
+    try:
+        download(extended)                                          # Builds the stub responses once, untimed
+        with tempfile.TemporaryDirectory() as folder:
+            cached = lambda last: monitoring.cached_data('MR8', 'PM10', start, last, folder, server.base_url)
+            print(f'{days} day window, extended by {extend} days, {delay * 1000:.0f} ms per request')
+            print(f"{'step':>9} {'download + parse (s)':>20} {'cache (s)':>10}")
+            for step, last in (('first', end), ('re-view', end), ('extend', extended)):
+                _, slow = _timed(download, last)
+                _, fast = _timed(cached, last)
+                print(f"{step:>9} {slow:>20.3f} {fast:>10.3f}")
+    finally:
+        server.shutdown()
+
+def _legacy_parse_json(json_data:dict):
+    """
+    Original monitoring.parse_json: expands every record with apply(pd.Series) and cleans values with a regex replace
+
+    Arguments:
+        json_data (dict): json dictionary
+    Returns:
+        aq_data (DataFrame): parsed data (string index, with an extra 'Date' row)
+    """
+    import pandas as pd
+    aq_data = pd.DataFrame(json_data['RawAQData'])
+    aq_data = pd.concat([aq_data.drop(['Data'], axis=1), aq_data['Data'].apply(pd.Series)], axis=1)
+    aq_data = aq_data.rename(columns={"@SiteCode": "Site", "@SpeciesCode": "Pollutant", "@MeasurementDateGMT": "Date", "@Value": "Value"})
+    aq_data.loc['Date'] = pd.to_datetime(aq_data['Date'], format='%Y-%m-%d %H:%M:%S')
+    aq_data = aq_data.set_index('Date')
+    aq_data = aq_data.replace(r'^\s*$', np.nan, regex=True)
+    aq_data['Value'] = aq_data['Value'].astype(float)
+    return aq_data.dropna()
+
+def bench_parse_json(sites:int=10, days:int=365, legacy_sites:int=2):
+    """
+    Benchmarks monitoring.parse_json on a synthetic multi-site payload (one response per site, hourly readings)
+    against the original parse_json applied to each response
+
+    Arguments:
+        sites (int): number of sites
+        days (int): days of hourly readings per site
+        legacy_sites (int): number of sites parsed by the original parse_json (scaled up to all sites)
+    Outputs:
+        prints time taken by each implementation
+    """
+    import pandas as pd
+    import monitoring
+    start = pd.Timestamp('2022-01-01')
+    payloads = [synthetic_api_payload(f'S{n:02d}', 'PM10', start.date(), (start + pd.Timedelta(days=days)).date(), seed=n) for n in range(sites)]
+    legacy, slow = _timed(lambda: [_legacy_parse_json(payload) for payload in payloads[:legacy_sites]])
+    parsed, fast = _timed(monitoring.parse_json, payloads)
+    for old in legacy:
+        new = parsed[parsed['Site'] == old['Site'].iloc[0]]
+        assert np.allclose(old['Value'].to_numpy(float), new['Value'].to_numpy()), 'values differ'
+    print(f'{sites} sites x {days} days = {sites * days * 24} records')
+    print(f"{'original (s)':>13} {'rewritten (s)':>14}")
+    print(f"{slow * sites / legacy_sites:>13.3f} {fast:>14.3f}   (original timed on {legacy_sites} sites and scaled)")
+
+def bench_stream_json(days:int=3650, batch_size:int=10000):
+    """
+    Benchmarks parsing one long AirQuality response served by stub_api_server: the whole response at once
+    (monitoring.get_live_data_from_api + parse_json) against monitoring.stream_live_data, both aggregated to daily values
+
+    Arguments:
+        days (int): days of hourly readings in the response
+        batch_size (int): readings per streamed batch
+    Outputs:
+        prints time taken and peak memory (tracemalloc) of each approach
+    """
+    import datetime, tracemalloc
+    import monitoring
+    start = datetime.date(2012, 1, 1)
+    end = start + datetime.timedelta(days=days)
+    server = stub_api_server(delay=0)
+    try:
+        monitoring.get_live_data_from_api('MR8', 'PM10', start, end, base_url=server.base_url)             # Builds the response once
+        results = []
+        for name, batches in (('whole', lambda: [monitoring.parse_json(monitoring.get_live_data_from_api('MR8', 'PM10', start, end, base_url=server.base_url))]),
+                              ('streamed', lambda: monitoring.stream_live_data('MR8', 'PM10', start, end, base_url=server.base_url, batch_size=batch_size))):
+            aggregate, seconds = _timed(lambda: monitoring.aggregate_batches(batches(), 'D'))
+            tracemalloc.start()                                                                         # Timed separately, tracemalloc slows Python code down
+            monitoring.aggregate_batches(batches(), 'D')
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            results.append((name, aggregate, seconds, peak))
+    finally:
+        server.shutdown()
+    assert np.allclose(results[0][1].to_numpy(), results[1][1].to_numpy()), 'aggregates differ'
+    print(f'{days} days = {days * 24} records')
+    print(f"{'':>9} {'time (s)':>9} {'peak (MB)':>10}")
+    for name, _, seconds, peak in results:
+        print(f'{name:>9} {seconds:>9.3f} {peak / 2**20:>10.1f}')
+
+def bench_text_graph(sizes:tuple=(720, 10**4, 10**6), width:int=150, full_limit:int=10**4):
+    """
+    Benchmarks monitoring.text_graph on hourly series: one bar per reading (as the original graph drew them)
+    against series bucketed to the graph width with each reduction
+
+    Arguments:
+        sizes (tuple): numbers of readings
+        width (int): bars on the bucketed graph
+        full_limit (int): largest series drawn with one bar per reading
+    Outputs:
+        prints time taken by each method
+    """
+    import io
+    import pandas as pd
+    import monitoring
+    rng = np.random.default_rng(0)
+    print(f"{'n':>9} {'full (s)':>9} {'max (s)':>9} {'mean (s)':>9} {'min (s)':>9}")
+    for n in sizes:
+        frame = pd.DataFrame({'Site': 'MR8', 'Pollutant': 'PM10', 'Value': np.round(rng.gamma(2.0, 10.0, n), 1)},
+                             index=pd.DatetimeIndex(pd.date_range('1900-01-01', periods=n, freq='h'), name='Date'))
+        full = _timed(monitoring.text_graph, frame, view=2, width=n, file=io.StringIO())[1] if n <= full_limit else float('nan')
+        times = [_timed(monitoring.text_graph, frame, view=2, width=width, how=how, file=io.StringIO())[1] for how in ('max', 'mean', 'min')]
+        print(f'{n:>9} {full:>9.4f} ' + ' '.join(f'{seconds:>9.4f}' for seconds in times))
+
+
+BENCHMARKS = {
+    'labelling': bench_labelling,
+    'top_k': bench_top_k,
+    'classify': bench_classify,
+    'tiled': bench_tiled,
+    'parallel': bench_parallel,
+    'import': bench_import,
+    'parse': bench_parse,
+    'aggregates': bench_aggregates,
+    'stream': bench_stream,
+    'quantiles': bench_quantiles,
+    'peaks': bench_peaks,
+    'rolling': bench_rolling,
+    'quality': bench_quality,
+    'stats': bench_stats,
+    'sort': bench_sort,
+    'histogram': bench_histogram,
+    'fetch': bench_fetch,
+    'api_cache': bench_api_cache,
+    'parse_json': bench_parse_json,
+    'stream_json': bench_stream_json,
+    'text_graph': bench_text_graph,
+}
+
+if __name__ == '__main__':
+    import sys
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        print(f'\n[{name}]')
+        BENCHMARKS[name]()
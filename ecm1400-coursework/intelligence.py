@@ -1,166 +1,797 @@
 from skimage import io 
 import numpy as np
-import utils
+import os
+import pandas as pd
 
 io.use_plugin('matplotlib')
 
+COLOUR_RULES = {                                                    # Inclusive (lower, upper) bounds of each RGB channel
+    'red':  ((101, 255), (0, 49), (0, 49)),                         # R > 100, G < 50, B < 50
+    'cyan': ((0, 49), (101, 255), (101, 255)),                      # R < 50, G > 100, B > 100
+}
 
+def _read_rgb(image) -> np.ndarray:
+    """
+    Reads an image file (or takes an image array) as unsigned 8-bit RGB values (0-255), discarding any alpha channel
+
+    Arguments:
+        image (str | np.ndarray): path to image file, or image array (uint8, or float 0-1)
+    Returns:
+        rgb (np.ndarray): 3D uint8 array (view of the decoded image where possible)
+    """
+    if not isinstance(image, np.ndarray):
+        image = io.imread(image, plugin='imageio')                  # imageio decodes straight to uint8 (matplotlib would give float 0-1)
+    if image.dtype != np.uint8:
+        image = np.rint(image[:,:,:3] * 255).astype(np.uint8)
+    return image[:,:,:3]
+
+def classify_pixels(image, rules:dict=COLOUR_RULES, save:bool=False) -> dict:
+    """
+    Classifies pixels into every colour of a table of threshold rules in one pass over the image
+    Each channel value (0-255) is looked up in a table holding one bit per rule; a pixel matches a rule
+    when its bit is set for all three channels, so the cost does not grow with the number of rules (up to 64)
+
+    Arguments:
+        image (str | np.ndarray): path to image file, or image array
+        rules (dict): colour name -> ((R lower, R upper), (G lower, G upper), (B lower, B upper)), default = COLOUR_RULES
+        save (bool): default = False; if True, saves a binary image file of each colour
+    Outputs:
+        map-<colour>-pixels.jpg: binary image file of each colour (saved in ./data/, if save is True)
+    Returns:
+        masks (dict): colour name -> 2D boolean array, True for pixels of that colour
+    """
+    if len(rules) > 64:
+        raise ValueError('At most 64 colour rules can be classified at once')
+    rgb = _read_rgb(image)
+    bits = np.min_scalar_type(2**len(rules) - 1) if rules else np.dtype(np.uint8)
+    lookup = np.zeros((3,256), dtype=bits)
+    for bit, bounds in enumerate(rules.values()):
+        for channel, (lower, upper) in enumerate(bounds):
+            lower, upper = max(lower, 0), min(upper, 255)               # Bounds outside 0-255 must not wrap around the table
+            if lower <= upper:                                          # lower > upper: no value matches
+                lookup[channel, lower:upper+1] |= bits.type(1) << bits.type(bit)
+    codes = lookup[0][rgb[:,:,0]]                                   # Bit k of codes is set when the pixel matches rule k
+    codes &= lookup[1][rgb[:,:,1]]
+    codes &= lookup[2][rgb[:,:,2]]
+
+    masks = {}
+    for bit, name in enumerate(rules):
+        masks[name] = (codes & (bits.type(1) << bits.type(bit))) != 0
+        if save:
+            io.imsave(f'data/map-{name}-pixels.jpg', _mask_image(masks[name]))
+            print(f'File saved as: ./data/map-{name}-pixels.jpg')
+    return masks
+
+def _mask_image(mask:np.ndarray) -> np.ndarray:
+    """
+    Converts a 2D boolean array into a binary RGB image: white (255) where True, black (0) elsewhere
+
+    Arguments:
+        mask (np.ndarray): 2D boolean array
+    Returns:
+        image (np.ndarray): 3D uint8 array
+    """
+    return np.repeat(mask[:,:,np.newaxis], 3, axis=2).astype(np.uint8) * 255
 
 def find_red_pixels(map_filename:str, upper_threshold=100, lower_threshold=50) -> np.ndarray:
     """
-    Finds all red pixels and generates a binary image file
+    Finds all red pixels and generates a binary image file (see: classify_pixels)
     Red is RGB-value defined by these thresholds: (R > 100, G < 50, B < 50)
 
     Arguments:
         map_filename (str): Path to image file
-        upper_threshold (int): default = 100
-        lower_threshold (int): default = 50
+        upper_threshold (int | float): default = 100
+        lower_threshold (int | float): default = 50
     Outputs:
         map-red-pixels.jpg: binary image file (saved in ./data/)
     Returns:
         map_array (np.ndarray): 2D array representing image file
     """
-
-
-
-    map_array = io.imread(map_filename)                                     # Reads image file into 2D Numpy array
-    map_array = map_array[:,:,:3] * 255                                     # Retains first three values of each pixel (removes alpha channel) and scales RGB channels to 0-255
-    red_pixels = np.where(  (map_array[:,:,0] > upper_threshold) &          # Identifies red pixels based on RGB values
-                            (map_array[:,:,1] < lower_threshold) & 
-                            (map_array[:,:,2] < lower_threshold)   )
-    map_array[red_pixels] = [255, 255, 255]                                 # Marks red pixels white
-    map_array[np.any(map_array != [255, 255, 255], axis=2)] = [0, 0, 0]     # Marks non-white (non-red) pixels black
-    map_array = map_array.astype(np.uint8)                                  # Converts array into unsigned 8-bit integers (0-255) from signed 32-bit floating point number
-    io.imsave('data/map-red-pixels.jpg', map_array)                         # Outputs jpg file of marked pixels
-    print('File saved as: ./data/map-red-pixels.jpg')
-    return map_array
-
+    above, below = int(np.floor(upper_threshold))+1, int(np.ceil(lower_threshold))-1    # Integer bounds, so > and < still hold for floats
+    rule = ((above, 255), (0, below), (0, below))
+    masks = classify_pixels(map_filename, {'red': rule}, save=True)
+    return _mask_image(masks['red'])
 
 def find_cyan_pixels(map_filename:str, upper_threshold=100, lower_threshold=50) -> np.ndarray:
     """
-    Finds all cyan pixels and generates a binary image file
-    Cyan is RGB-value defined by these thresholds: (R < 50, G > 100, G > 100)
+    Finds all cyan pixels and generates a binary image file (see: classify_pixels)
+    Cyan is RGB-value defined by these thresholds: (R < 50, G > 100, B > 100)
 
     Arguments:
         map_filename (str): Path to image file
-        upper_threshold (int): default = 100
-        lower_threshold (int): default = 50
+        upper_threshold (int | float): default = 100
+        lower_threshold (int | float): default = 50
     Outputs:
         map-cyan-pixels.jpg: binary image file (saved in ./data/)
     Returns:
         map_array (np.ndarray): 2D array representing image file
     """
-    map_array = io.imread(map_filename)
-    map_array = map_array[:,:,:3] * 255        
-    cyan_pixels = np.where( (map_array[:,:,0] < lower_threshold) &          # Identifies cyan pixels based on RGB values
-                            (map_array[:,:,1] > upper_threshold) & 
-                            (map_array[:,:,2] > upper_threshold)   )                            
-    map_array[cyan_pixels] = [255, 255, 255]                                # Marks cyan pixels white
-    map_array[np.any(map_array != [255, 255, 255], axis=2)] = [0, 0, 0] 
-    map_array = map_array.astype(np.uint8)      
-    io.imsave('data/map-cyan-pixels.jpg', map_array)
-    print('File saved as: ./data/map-cyan-pixels.jpg')
-    return map_array
+    above, below = int(np.floor(upper_threshold))+1, int(np.ceil(lower_threshold))-1    # Integer bounds, so > and < still hold for floats
+    rule = ((0, below), (above, 255), (above, 255))
+    masks = classify_pixels(map_filename, {'cyan': rule}, save=True)
+    return _mask_image(masks['cyan'])
+
+def _pavement_mask(image:np.ndarray) -> np.ndarray:
+    """
+    Finds pavement pixels in a binary image file (see: find_red_pixels, find_cyan_pixels)
+    A pixel is a pavement pixel when all RGB-channel values exceed 200 (compensates for jpg lossy compression)
+    or when any RGB-channel value is 255
+
+    Arguments:
+        image (np.ndarray): 3D array representing image file
+    Returns:
+        mask (np.ndarray): 2D boolean array, True for pavement pixels
+    """
+    rgb = image[:,:,:3]
+    return np.all(rgb > 200, axis=2) | np.any(rgb == 255, axis=2)
+
+def _find_runs(mask:np.ndarray) -> tuple:
+    """
+    Finds all horizontal runs (consecutive True pixels in a row) of a 2D boolean array
+    Runs are returned in raster order (top to bottom, left to right)
+
+    Arguments:
+        mask (np.ndarray): 2D boolean array
+    Returns:
+        rows (np.ndarray): row of each run
+        starts (np.ndarray): first column of each run
+        ends (np.ndarray): column after the last pixel of each run
+    """
+    i,j = mask.shape
+    padded = np.zeros((i,j+2), dtype=np.int8)                      # Pads each row with a background pixel on both sides
+    padded[:,1:-1] = mask
+    edges = np.diff(padded, axis=1)                                 # +1 where a run starts, -1 after a run ends
+    rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+def _link_runs(rows:np.ndarray, starts:np.ndarray, ends:np.ndarray, width:int) -> tuple:
+    """
+    Finds every pair of 8-connected runs in adjacent rows
+    Runs in a row are sorted and disjoint, so the runs above a run (s,e) that touch it form one contiguous block:
+    those with end >= s and start <= e. Both bounds are found with a binary search on (row, column) keys
+
+    Arguments:
+        rows, starts, ends (np.ndarray): runs in raster order (see: _find_runs)
+        width (int): width of the image
+    Returns:
+        upper (np.ndarray): index of the run in the upper row of each pair
+        lower (np.ndarray): index of the run in the lower row of each pair
+    """
+    stride = width + 1
+    start_keys = rows * stride + starts
+    end_keys = rows * stride + ends
+    above = (rows - 1) * stride
+    lo = np.searchsorted(end_keys, above + starts, side='left')    # First run in the row above that ends at or after this run starts
+    hi = np.searchsorted(start_keys, above + ends, side='right')    # Last run (exclusive) in the row above that starts at or before this run ends
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+    lower = np.repeat(np.arange(len(rows)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    upper = np.repeat(lo, counts) + offsets
+    return upper, lower
+
+def _resolve(parent:np.ndarray, a:np.ndarray, b:np.ndarray) -> np.ndarray:
+    """
+    Union-find over an array-based forest: joins the trees of a[k] and b[k] for every k
+    Each round hooks the larger root of every pair onto the smaller root, then compresses every path,
+    so parent[x] <= x always holds and each tree ends up rooted at its smallest member.
+    The number of trees per component at least halves each round
+
+    Arguments:
+        parent (np.ndarray): parent of each node (np.arange(n) for n separate nodes)
+        a, b (np.ndarray): pairs of nodes to join
+    Returns:
+        parent (np.ndarray): root of each node
+    """
+    parent = parent.copy()
+    while True:
+        while True:                                                 # Path compression: point every node at its root
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+        root_a, root_b = parent[a], parent[b]
+        joined = root_a != root_b
+        if not joined.any():
+            return parent
+        root_a, root_b = root_a[joined], root_b[joined]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+
+def _label_band(mask:np.ndarray) -> tuple:
+    """
+    Finds the runs of a band of rows and joins the linked runs (see: label_components)
+
+    Arguments:
+        mask (np.ndarray): 2D boolean array
+    Returns:
+        rows, starts, ends (np.ndarray): runs in raster order (rows relative to the band)
+        roots (np.ndarray): first run of the component of each run
+    """
+    rows, starts, ends = _find_runs(mask)
+    upper, lower = _link_runs(rows, starts, ends, mask.shape[1])
+    return rows, starts, ends, _resolve(np.arange(len(rows)), upper, lower)
 
-def detect_connected_components(IMG:str)-> np.ndarray:
+def _label_bands(mask:np.ndarray, workers:int, processes:bool) -> tuple:
+    """
+    Splits the mask into horizontal bands, labels each band in a pool of workers (see: _label_band),
+    then joins components across band borders with a union-find over the runs on either side of each border
+
+    Arguments:
+        mask (np.ndarray): 2D boolean array
+        workers (int): number of bands and workers
+        processes (bool): use a process pool instead of a thread pool
+    Returns:
+        rows, starts, ends (np.ndarray): runs in raster order
+        roots (np.ndarray): first run of the component of each run
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    borders = np.linspace(0, mask.shape[0], workers + 1).astype(int)
+    pool = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with pool(max_workers=workers) as executor:
+        bands = list(executor.map(_label_band, [mask[top:bottom] for top, bottom in zip(borders[:-1], borders[1:])]))
+
+    offsets = np.cumsum([0] + [len(band[0]) for band in bands])     # Index of the first run of each band
+    rows = np.concatenate([band[0] + top for band, top in zip(bands, borders)])
+    starts = np.concatenate([band[1] for band in bands])
+    ends = np.concatenate([band[2] for band in bands])
+    roots = np.concatenate([band[3] + offset for band, offset in zip(bands, offsets)])
+
+    seam = np.flatnonzero(np.isin(rows, np.concatenate([borders[1:-1] - 1, borders[1:-1]])))  # Runs either side of a border
+    upper, lower = _link_runs(rows[seam], starts[seam], ends[seam], mask.shape[1])
+    crossing = np.isin(rows[seam][lower], borders[1:-1])            # Only pairs across a border (pairs inside a band are already joined)
+    return rows, starts, ends, _resolve(roots, seam[upper][crossing], seam[lower][crossing])
+
+def label_runs(mask:np.ndarray, workers:int=1, processes:bool=False) -> dict:
+    """
+    Labels all 8-neighbour connected components of a 2D boolean array in linear time, as run-length encoded components
+    Uses a run-length scanline algorithm:
+
+        - Finds horizontal runs of pavement pixels in each row
+        - Links runs in adjacent rows that overlap or touch diagonally
+        - Joins linked runs with a union-find (see: _resolve)
+        - Numbers components in order of their first pixel in a top-to-bottom, left-to-right scan
+
+    With more than one worker, horizontal bands are labelled in parallel and joined at their borders (see: _label_bands)
+    Gives the same labels as Algorithm 1 (as per specification)
+
+    Arguments:
+        mask (np.ndarray): 2D boolean array, True for pavement pixels
+        workers (int): number of parallel workers, default = 1
+        processes (bool): default = False (thread pool); if True, uses a process pool
+    Returns:
+        runs (dict): run-length encoded components (see: _pack_runs)
+    """
+    workers = max(1, min(workers, mask.shape[0]))
+    if workers > 1:
+        rows, starts, ends, roots = _label_bands(mask, workers, processes)
+    else:
+        rows, starts, ends, roots = _label_band(mask)
+    is_root = roots == np.arange(len(roots))                        # Each component is rooted at its first run, so roots follow scan order
+    labels = np.cumsum(is_root)[roots]
+    return _pack_runs(mask.shape, rows, starts, ends, labels)
+
+def label_components(mask:np.ndarray, workers:int=1, processes:bool=False) -> np.ndarray:
+    """
+    Labels all 8-neighbour connected components of a 2D boolean array (see: label_runs)
+
+    Arguments:
+        mask (np.ndarray): 2D boolean array, True for pavement pixels
+        workers (int): number of parallel workers, default = 1
+        processes (bool): default = False (thread pool); if True, uses a process pool
+    Returns:
+        MARK (np.ndarray): 2D array representing connected components (0 = background), in the smallest unsigned integer type that fits
+    """
+    return decode_runs(label_runs(mask, workers, processes))
+
+def _pack_runs(shape:tuple, rows:np.ndarray, starts:np.ndarray, ends:np.ndarray, labels:np.ndarray) -> dict:
+    """
+    Stores labelled runs in the smallest unsigned integer types that fit
+
+    Arguments:
+        shape (tuple): (height, width) of the image
+        rows, starts, ends (np.ndarray): runs in raster order (see: _find_runs)
+        labels (np.ndarray): component label of each run
+    Returns:
+        runs (dict): 'shape', 'rows', 'starts', 'ends' and 'labels' arrays
+    """
+    height, width = shape
+    return {
+        'shape': np.array([height, width], dtype=np.int64),
+        'rows': rows.astype(np.min_scalar_type(max(height - 1, 0))),
+        'starts': starts.astype(np.min_scalar_type(width)),
+        'ends': ends.astype(np.min_scalar_type(width)),
+        'labels': labels.astype(np.min_scalar_type(int(labels.max(initial=0)))),
+    }
+
+def _unpack_runs(runs:dict) -> tuple:
+    """
+    Reads labelled runs back as native integers for arithmetic
+
+    Arguments:
+        runs (dict): run-length encoded components (see: _pack_runs)
+    Returns:
+        rows, starts, ends, labels (np.ndarray): runs in raster order and their labels
+        shape (tuple): (height, width) of the image
+    """
+    arrays = [runs[name].astype(np.intp) for name in ('rows', 'starts', 'ends', 'labels')]
+    return (*arrays, tuple(int(n) for n in runs['shape']))
+
+def _run_positions(rows:np.ndarray, starts:np.ndarray, ends:np.ndarray, width:int) -> np.ndarray:
+    """
+    Finds the flat (row * width + column) position of every pixel covered by the runs
+
+    Arguments:
+        rows, starts, ends (np.ndarray): runs (see: _find_runs)
+        width (int): width of the image
+    Returns:
+        positions (np.ndarray): flat position of each pixel, run by run
+    """
+    lengths = ends - starts
+    offsets = np.repeat(rows * width + starts - (np.cumsum(lengths) - lengths), lengths)
+    return offsets + np.arange(int(lengths.sum()))
+
+def encode_runs(MARK:np.ndarray) -> dict:
+    """
+    Converts a 2D array of connected components into run-length encoded components
+
+    Arguments:
+        MARK (np.ndarray): 2D array representing connected components (see: label_components)
+    Returns:
+        runs (dict): run-length encoded components (see: _pack_runs)
+    """
+    rows, starts, ends = _find_runs(MARK > 0)
+    return _pack_runs(MARK.shape, rows, starts, ends, MARK[rows, starts])
+
+def decode_runs(runs:dict) -> np.ndarray:
+    """
+    Converts run-length encoded components into a 2D array of connected components
+
+    Arguments:
+        runs (dict): run-length encoded components (see: _pack_runs)
+    Returns:
+        MARK (np.ndarray): 2D array representing connected components (0 = background)
+    """
+    rows, starts, ends, labels, shape = _unpack_runs(runs)
+    MARK = np.zeros(shape, dtype=runs['labels'].dtype)
+    MARK.flat[_run_positions(rows, starts, ends, shape[1])] = np.repeat(labels, ends - starts)
+    return MARK
+
+def save_runs(runs:dict, filename:str):
+    """
+    Saves run-length encoded components to a compressed .npz file
+
+    Arguments:
+        runs (dict): run-length encoded components (see: _pack_runs)
+        filename (str): path to .npz file
+    Outputs:
+        compressed .npz file with the arrays of runs
+    """
+    np.savez_compressed(filename, **runs)
+    print('File saved as: ' + os.path.join('.', filename))
+
+def load_runs(filename:str) -> dict:
+    """
+    Loads run-length encoded components saved with save_runs()
+
+    Arguments:
+        filename (str): path to .npz file
+    Returns:
+        runs (dict): run-length encoded components (see: _pack_runs)
+    """
+    with np.load(filename) as arrays:
+        return {name: arrays[name] for name in arrays.files}
+
+def _as_runs(MARK) -> tuple:
+    """
+    Reads connected components given either as a 2D array or as run-length encoded components
+
+    Arguments:
+        MARK (np.ndarray | dict): 2D array representing connected components, or run-length encoded components
+    Returns:
+        rows, starts, ends, labels (np.ndarray): runs in raster order and their labels
+        shape (tuple): (height, width) of the image
+    """
+    return _unpack_runs(MARK if isinstance(MARK, dict) else encode_runs(MARK))
+
+STAT_REDUCTIONS = {                                                 # How each per-run quantity is combined over the runs of a component
+    'first': np.minimum,                                            # Position (row * width + column) of the first pixel in scan order
+    'pixels': np.add,
+    'sum_row': np.add,
+    'sum_col': np.add,
+    'min_row': np.minimum,
+    'min_col': np.minimum,
+    'max_row': np.maximum,
+    'max_col': np.maximum,
+    'perimeter': np.add,
+}
+
+def _run_items(rows:np.ndarray, starts:np.ndarray, ends:np.ndarray, width:int) -> dict:
+    """
+    Computes the contribution of each run to the statistics of its component (see: STAT_REDUCTIONS)
+    Each run has two side edges and its length in top and bottom edges on the perimeter; edges shared with
+    runs in adjacent rows are removed separately (see: _shared_edges). All values are integers, so totals are exact
+
+    Arguments:
+        rows, starts, ends (np.ndarray): runs in raster order (see: _find_runs)
+        width (int): width of the image
+    Returns:
+        items (dict): statistic name -> value of each run
+    """
+    lengths = ends - starts
+    return {
+        'first': rows * width + starts,
+        'pixels': lengths,
+        'sum_row': lengths * rows,
+        'sum_col': (ends * (ends - 1) - starts * (starts - 1)) // 2,   # Sum of the columns starts..ends-1
+        'min_row': rows,
+        'min_col': starts,
+        'max_row': rows,
+        'max_col': ends - 1,
+        'perimeter': 2 + 2 * lengths,
+    }
+
+def _shared_edges(rows:np.ndarray, starts:np.ndarray, ends:np.ndarray, width:int) -> np.ndarray:
+    """
+    Counts the pixel edges each run shares with runs in the rows directly above and below it
+
+    Arguments:
+        rows, starts, ends (np.ndarray): runs in raster order (see: _find_runs)
+        width (int): width of the image
+    Returns:
+        shared (np.ndarray): number of shared edges of each run
+    """
+    upper, lower = _link_runs(rows, starts, ends, width)
+    overlap = np.maximum(np.minimum(ends[upper], ends[lower]) - np.maximum(starts[upper], starts[lower]), 0)
+    shared = np.bincount(upper, weights=overlap, minlength=len(rows)) + np.bincount(lower, weights=overlap, minlength=len(rows))
+    return shared.astype(np.int64)
+
+def _reduce_groups(items:dict, groups:np.ndarray) -> tuple:
+    """
+    Combines items that belong to the same group (see: STAT_REDUCTIONS)
+
+    Arguments:
+        items (dict): statistic name -> value of each item
+        groups (np.ndarray): non-negative group of each item
+    Returns:
+        keys (np.ndarray): groups in ascending order
+        totals (dict): statistic name -> combined value of each group
+    """
+    order = np.argsort(groups, kind='stable')
+    sorted_groups = groups[order]
+    first = np.flatnonzero(np.diff(sorted_groups, prepend=-1))      # Index of the first item of each group
+    totals = {}
+    for name, values in items.items():
+        totals[name] = STAT_REDUCTIONS[name].reduceat(values[order], first) if len(first) else values[:0]
+    return sorted_groups[first], totals
+
+def _stats_table(labels:np.ndarray, totals:dict) -> pd.DataFrame:
+    """
+    Builds the component statistics table:
+
+        - pixels: number of pixels
+        - min_row, min_col, max_row, max_col: bounding box (inclusive)
+        - centroid_row, centroid_col: mean pixel position
+        - perimeter: number of pixel edges between the component and the background (or edge of image)
+
+    Arguments:
+        labels (np.ndarray): label of each component
+        totals (dict): statistic name -> total of each component (see: _reduce_groups)
+    Returns:
+        table (DataFrame): component statistics indexed by component label
+    """
+    pixels = totals['pixels']
+    return pd.DataFrame({
+        'pixels': pixels,
+        'min_row': totals['min_row'],
+        'min_col': totals['min_col'],
+        'max_row': totals['max_row'],
+        'max_col': totals['max_col'],
+        'centroid_row': totals['sum_row'] / pixels,
+        'centroid_col': totals['sum_col'] / pixels,
+        'perimeter': totals['perimeter'],
+    }, index=pd.Index(labels, name='component'))
+
+def component_stats(MARK) -> pd.DataFrame:
+    """
+    Computes pixel count, bounding box, centroid and perimeter of every connected component in one vectorised pass
+    over the runs of MARK (see: _stats_table)
+
+    Arguments:
+        MARK (np.ndarray | dict): 2D array representing connected components (see: label_components), or run-length encoded components (see: label_runs)
+    Returns:
+        table (DataFrame): component statistics indexed by component label
+    """
+    rows, starts, ends, run_labels, (_, width) = _as_runs(MARK)
+    items = _run_items(rows, starts, ends, width)
+    items['perimeter'] = items['perimeter'] - _shared_edges(rows, starts, ends, width)
+    labels, totals = _reduce_groups(items, run_labels)
+    return _stats_table(labels, totals)
+
+def _open_image(image):
+    """
+    Opens an image for reading in strips without decoding it up front where possible:
+
+        - np.ndarray (including np.memmap): used as-is
+        - .npy file: memory-mapped, so only the rows being read are loaded
+        - other image files: decoded in full with io.imread (compressed formats cannot be read in strips)
+
+    Arguments:
+        image (str | np.ndarray): path to image file, or image array
+    Returns:
+        source (np.ndarray): 3D array (height, width, channels)
+    """
+    if isinstance(image, np.ndarray):
+        return image
+    if str(image).endswith('.npy'):
+        return np.load(image, mmap_mode='r')
+    return io.imread(image, plugin='imageio')
+
+def component_stats_tiled(image, colour:str=None, strip_rows:int=256) -> pd.DataFrame:
+    """
+    Finds connected components and their statistics strip by strip, so peak memory depends on the strip size
+    and image width but not on the image height. Gives the same table as component_stats(label_components(mask))
+
+    For each strip of rows:
+
+        - Classifies the strip (colour rule, or pavement pixels of a binary image) and finds its runs
+        - Links the runs to each other and to the open components (runs in the last row of the previous strip) across the seam
+        - Joins linked runs and open components with a union-find and combines their statistics
+        - Components with no run in the last row of the strip cannot grow further and are finished
+
+    Components are labelled in order of their first pixel once all strips are read
+
+    Arguments:
+        image (str | np.ndarray): path to image file (.npy files are memory-mapped), or image array
+        colour (str): name of colour rule in COLOUR_RULES, default = None (pavement pixels of a binary image, see: _pavement_mask)
+        strip_rows (int): number of rows read at a time, default = 256
+    Returns:
+        table (DataFrame): component statistics indexed by component label (see: component_stats)
+    """
+    source = _open_image(image)
+    height, width = source.shape[:2]
+    empty = np.empty(0, dtype=np.intp)
+    open_totals = {name: empty for name in STAT_REDUCTIONS}         # Statistics of components touching the last row read
+    carry_starts, carry_ends, carry_component = empty, empty, empty # Runs in the last row read, and their open component
+    finished = []
+
+    for top in range(0, height, strip_rows):
+        strip = np.asarray(source[top:top+strip_rows])
+        if colour is None:
+            mask = _pavement_mask(strip)
+        else:
+            mask = classify_pixels(strip, {colour: COLOUR_RULES[colour]})[colour]
+        rows, starts, ends = _find_runs(mask)
+        rows = rows + top
+        carried = len(carry_starts)                                 # Nodes 0..carried-1 are the carried runs, then the runs of this strip
+
+        all_rows = np.concatenate([np.full(carried, top - 1), rows])
+        all_starts = np.concatenate([carry_starts, starts])
+        all_ends = np.concatenate([carry_ends, ends])
+        upper, lower = _link_runs(all_rows, all_starts, all_ends, width)
+        by_component = np.argsort(carry_component, kind='stable')   # Carried runs of the same open component are joined too
+        same = carry_component[by_component][1:] == carry_component[by_component][:-1]
+        roots = _resolve(np.arange(len(all_rows)), np.concatenate([upper, by_component[:-1][same]]),
+                                                   np.concatenate([lower, by_component[1:][same]]))
+
+        shared = _shared_edges(all_rows, all_starts, all_ends, width)
+        items = _run_items(rows, starts, ends, width)
+        items['perimeter'] = items['perimeter'] - shared[carried:]
+        open_totals['perimeter'] = open_totals['perimeter'] - np.bincount(carry_component, weights=shared[:carried],
+                                                                          minlength=len(open_totals['pixels'])).astype(np.int64)
+        component_node = np.empty(len(open_totals['pixels']), dtype=np.intp)
+        component_node[carry_component] = np.arange(carried)        # One carried run of each open component
+
+        groups = np.concatenate([roots[carried:], roots[component_node]])
+        keys, totals = _reduce_groups({name: np.concatenate([items[name], open_totals[name]]) for name in items}, groups)
+
+        last = rows == top + mask.shape[0] - 1
+        still_open = np.isin(keys, roots[carried:][last])
+        finished.append({name: values[~still_open] for name, values in totals.items()})
+        open_totals = {name: values[still_open] for name, values in totals.items()}
+        carry_starts, carry_ends = starts[last], ends[last]
+        carry_component = np.searchsorted(keys[still_open], roots[carried:][last])
+
+    finished.append(open_totals)
+    totals = {name: np.concatenate([chunk[name] for chunk in finished]) for name in STAT_REDUCTIONS}
+    order = np.argsort(totals['first'], kind='stable')             # Labels follow the first pixel of each component in scan order
+    return _stats_table(np.arange(1, len(order) + 1), {name: values[order] for name, values in totals.items()})
+
+def _write_components(filename:str, table:pd.DataFrame, verbose:bool=True):
+    """
+    Writes the pixel size of each connected component to a text file, in the order of the table
+
+    Arguments:
+        filename (str): path to text file
+        table (DataFrame): component statistics (see: component_stats)
+        verbose (bool): default = True; if True, prints the path of the file
+    Outputs:
+        text file with one line per component and the total number of components
+    """
+    lines = [f"Connected component {index}, number of pixels = {pixels} \n" for index, pixels in zip(table.index, table['pixels'])]
+    with open(filename,'w') as f:
+        f.write(''.join(lines))
+        f.write(f"Total number of connected components = {len(table)}")
+    if verbose:
+        print('File saved as: ' + os.path.join('.', filename))
+
+def detect_connected_components(IMG:str, workers:int=1)-> np.ndarray:
     """
     Finds all 8-neighbour connected components, returns 2D array with components, and generates text file with component data.
-    Uses a modified version of Algorithm 1 to detect connected components (as per specification) with the following changes:
+    Pavement pixels are found with _pavement_mask() and labelled with label_components(), which gives the same result
+    as Algorithm 1 (as per specification) in linear time:
         
-        - Each argument (e.g P(x,y)) is arranged in order of iteration: (y,x) where y,x = m,n = s,t
-            - Specifically: y,m,s iterates in the first dimension (vertical) and x,n,t in the second dimension (horizontal)
         - p(y,x) is a pavement pixel when RGB-channel values exceed threshold > 200: Compensates for jpg lossy compression
-        - MARK(y,x) = R, when set as visited: R is the counter for each connected region/component, where R > 0:
-        - end while condition: when Q is empty, R = R + 1
+        - MARK(y,x) = R, where R > 0 is the counter for each connected region/component, in order of first pixel (top to bottom, left to right)
 
     Arguments:
         IMG (str): Path to image file
+        workers (int): number of parallel workers used for labelling, default = 1
     Outputs:
         cc-output-2a.txt: text file with number of connected components and corresponding pixel size (saved in ./data/)
     Returns:
         MARK (np.ndarray): 2D array representing connected components
     """
-    from skimage import io 
-    
     image = io.imread(IMG)
-    image = np.copy(image)
-    threshold = np.where(   (image[:,:,0] > 200) &          # Threshold values for pixels due to jpg lossy compression
-                            (image[:,:,1] > 200) & 
-                            (image[:,:,2] > 200)   )
-    image[threshold] = [255,255,255]                        # Sets all pixels above threshold values as pavement pixels (value = 255)
-    i,j,_ = image.shape
-    MARK = np.zeros((i,j))
-
-    
-    R = 1                                                                       # R (Region counter)
-    Q = np.empty(0)
-    print("Computing results... (this may take some time)")
-    for y in range(i):                                                          # Scans image from top to bottom (y value)
-        for x in range(j):                                                      # In each row, scans from left to right (x value)
-            if np.any(image[y,x] == [255,255,255]) == True and MARK[y,x] == 0:
-                MARK[y,x] = R                                                   
-                coordinates = [y,x]
-                Q = np.append(Q, coordinates)
-                Q = Q.reshape(-1,2)                 # Arranges Q in y,x pairs
-                while np.size(Q) > 0:               # while Q is not empty do
-                    m,n = Q[0]                                                                                                  # Finds y,x values of neighbours of Q(m,n)
-                    neighbours = [      [min(m+1,i-1),   max(n-1,0)], [min(m+1,i-1),   n],  [min(m+1,i-1),  min(n+1,j-1)],      #   [:] [:] [:]    | Key:
-                                        [m           ,   max(n-1,0)],                       [m           ,  min(n+1,j-1)],      #   [:]  Q  [:]    |  Q  - pixel (m,n)
-                                        [max(m-1,0)  ,   max(n-1,0)], [max(m-1,0)  ,   n],  [max(m-1,0)  ,  min(n+1,j-1)]   ]   #   [:] [:] [:]    | [:] - eight-connected neighbour           
-                    for pixel in neighbours:                                                                                    # max() and min() used in case of upper and lower bounds (edge of image)                            
-                        s,t = pixel     
-                        s,t = int(s),int(t)         # converts (s,t) from float to integer                                        
-                        if np.any(image[s,t] == [255,255,255]) == True and MARK[s,t] == 0:
-                            MARK[s,t] = R
-                            coordinates = [s,t]
-                            Q = np.append(Q, coordinates)
-                            Q = Q.reshape(-1,2)
-                    Q = np.delete(Q, 0, axis = 0)   # remove first item q(m,n) from Q
-                else:
-                    R = R + 1                       # Over each pass in the loop where Q is empty, increment region counter
-    R = int(np.max(MARK))
-    component_array = MARK.flatten().tolist()       # Flattens 2D array -> 1D, makes it suitable for countvalue function (see utils.py)
-    with open('data/cc-output-2a.txt','w') as f:
-        for index in range(1,R+1):                  # For each region, count number of pixels
-            occurrence = utils.countvalue(component_array, index)
-            f.write(f"Connected component {index}, number of pixels = {occurrence} \n")
-        f.write(f"Total number of connected components = {R}")
-    print('File saved as: ./data/cc-output-2a.txt')
+    MARK = label_components(_pavement_mask(image), workers)
+    _write_components('data/cc-output-2a.txt', component_stats(MARK))
     return MARK   
 
-def detect_connected_components_sorted(MARK:np.ndarray):
+def top_k_components(MARK, k:int) -> np.ndarray:
+    """
+    Finds the k largest connected components without sorting every component
+    Uses a partial selection (np.partition) to find the k-th largest pixel size; components of equal size are chosen in order of label
+
+    Arguments:
+        MARK (np.ndarray | dict): 2D array representing connected components, or run-length encoded components (see: label_runs)
+        k (int): number of components
+    Returns:
+        labels (np.ndarray): labels of the k largest components, in decreasing order of pixel size
+    """
+    if isinstance(MARK, dict):
+        rows, starts, ends, run_labels, _ = _unpack_runs(MARK)
+        sizes = np.bincount(run_labels, weights=ends - starts).astype(np.int64)
+    else:
+        sizes = np.bincount(MARK[MARK > 0].astype(np.intp))         # Pixel size of each label (index = label)
+    labels = np.flatnonzero(sizes)
+    k = min(k, len(labels))
+    if k <= 0:
+        return labels[:0]
+    kth = np.partition(sizes[labels], len(labels) - k)[len(labels) - k] # k-th largest pixel size
+    larger = labels[sizes[labels] > kth]
+    tied = labels[sizes[labels] == kth][:k - len(larger)]            # Lowest labels of size kth fill the remaining places
+    chosen = np.concatenate([larger, tied])
+    return chosen[np.lexsort((chosen, -sizes[chosen]))]
+
+def render_top_k(MARK, k:int, filename:str=None) -> np.ndarray:
+    """
+    Generates a binary image of the k largest connected components (see: top_k_components)
+
+    Arguments:
+        MARK (np.ndarray | dict): 2D array representing connected components, or run-length encoded components (see: label_runs)
+        k (int): number of components
+        filename (str): path to image file, default = None (image is not saved)
+    Outputs:
+        binary image file of the k largest components (if filename is given)
+    Returns:
+        image (np.ndarray): 2D array, 255 for pixels in the k largest components and 0 elsewhere
+    """
+    top = top_k_components(MARK, k)
+    if isinstance(MARK, dict):
+        rows, starts, ends, labels, shape = _unpack_runs(MARK)
+        chosen = np.isin(labels, top)
+        image = np.zeros(shape, dtype=np.uint8)
+        image.flat[_run_positions(rows[chosen], starts[chosen], ends[chosen], shape[1])] = 255
+    else:
+        image = np.isin(MARK, top).astype(np.uint8) * 255
+    if filename is not None:
+        io.imsave(filename, image)
+        print('File saved as: ' + os.path.join('.', filename))
+    return image
+
+def detect_connected_components_sorted(MARK):
     """
     Procedure which lists and sorts connected components from input 2D array MARK, generates text file with connected components ordered by pixel size.
-    Generates image file of the top two largest
+    Components of equal size are listed in order of label. Generates image file of the top two largest (see: render_top_k)
 
     Arguments:
-        MARK (np.ndarray): 2D array representing connected components
+        MARK (np.ndarray | dict): 2D array representing connected components, or run-length encoded components (see: label_runs)
     Outputs:
         cc-output-2b.txt: text file with connected components listed in decreasing order of pixel size (saved in ./data/)
         cc-top-2.jpg: binary image file of top two largest connected components (saved in ./data/)
     """
-    R = int(np.max(MARK))                                                           # Total number of regions = Max value in MARK
-    cdict = {}
-    component_array = MARK.flatten().tolist()
     print('Sorting through connected components...')
-    for index in range(1,R+1):
-        occurrence = utils.countvalue(component_array, index)
-        cdict.update({index:occurrence})                                            # Saves each connected component and its pixel size in dictionary (cdict)
-    oc_array = utils.sorted(list(cdict.values()))                                   # Sorts pixel sizes in ascending order
-    oc_array.reverse()                                                              # Reverses order of pixel sizes; now in descending order
-    with open('data/cc-output-2b.txt','w') as f:
-        for item in oc_array:
-            index_key = [k for k,value in cdict.items() if value == item]           # For every pixel size, find connected component(s) associated with it
-            for key in index_key:
-                f.write(f"Connected component {key}, number of pixels = {item} \n")
-        f.write(f"Total number of connected components = {R}")
-    print('File saved as: ./data/cc-output-2b.txt')
-
-    region1 = [k for k,value in cdict.items() if value == oc_array[0]]              # Finds largest connected component
-    region2 = [k for k,value in cdict.items() if value == oc_array[1]]              # Finds second largest connected component
-    MARK[np.where((MARK != region1) & (MARK != region2))] = [0]                     # Marks all pixels not in largest two components black
-    MARK[np.where((MARK == region1) & (MARK == region2))] = [255]                   # Marks all pixels in largest two components white
-    io.imsave('data/cc-top-2.jpg', MARK)
-    print('File saved as: ./data/cc-top-2.jpg')
+    runs = MARK if isinstance(MARK, dict) else encode_runs(MARK)
+    table = component_stats(runs)
+    table = table.sort_values('pixels', ascending=False, kind='stable')            # Stable sort keeps components of equal size in order of label
+    _write_components('data/cc-output-2b.txt', table)
+    render_top_k(runs, 2, 'data/cc-top-2.jpg')
+
+def process_map(map_filename:str, output_dir:str, rules:dict=COLOUR_RULES) -> list:
+    """
+    Classifies one map image and finds the connected components of each colour (used by batch_process_maps)
+
+    Arguments:
+        map_filename (str): path to image file
+        output_dir (str): folder for the outputs of this image (created if needed)
+        rules (dict): colour rules (see: classify_pixels), default = COLOUR_RULES
+    Outputs (for each colour, saved in output_dir):
+        map-<colour>-pixels.jpg: binary image file of the colour
+        cc-<colour>-components.txt: connected components in order of label
+        cc-<colour>-sorted.txt: connected components in decreasing order of pixel size
+        cc-<colour>-top-2.jpg: binary image file of the two largest components
+        cc-<colour>-runs.npz: run-length encoded components (see: save_runs)
+    Returns:
+        summary (list): one dictionary per colour with the image, colour, pixel and component counts, largest component and time taken
+    """
+    import time
+    start = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    summary = []
+    for colour, mask in classify_pixels(map_filename, rules).items():
+        io.imsave(os.path.join(output_dir, f'map-{colour}-pixels.jpg'), _mask_image(mask), check_contrast=False)
+        runs = label_runs(mask)
+        np.savez_compressed(os.path.join(output_dir, f'cc-{colour}-runs.npz'), **runs)
+        table = component_stats(runs)
+        _write_components(os.path.join(output_dir, f'cc-{colour}-components.txt'), table, verbose=False)
+        _write_components(os.path.join(output_dir, f'cc-{colour}-sorted.txt'), table.sort_values('pixels', ascending=False, kind='stable'), verbose=False)
+        io.imsave(os.path.join(output_dir, f'cc-{colour}-top-2.jpg'), render_top_k(runs, 2), check_contrast=False)
+        summary.append({
+            'image': map_filename,
+            'colour': colour,
+            'pixels': int(mask.sum()),
+            'components': len(table),
+            'largest_component': int(table['pixels'].max()) if len(table) else 0,
+        })
+    seconds = time.perf_counter() - start
+    for row in summary:
+        row['seconds'] = seconds
+    return summary
+
+def batch_process_maps(maps:str, output_dir:str='data/batch', workers:int=None, rules:dict=COLOUR_RULES) -> pd.DataFrame:
+    """
+    Runs colour classification and connected components on every map image in a folder (or matching a glob pattern)
+    with a pool of worker processes (see: process_map)
+    Outputs of each image are saved in their own folder, named after the image file, so images never overwrite each other
+
+    Arguments:
+        maps (str): folder of .png/.jpg images, or glob pattern (e.g. 'maps/*.png')
+        output_dir (str): folder for all outputs, default = data/batch
+        workers (int): number of worker processes, default = None (one per core)
+        rules (dict): colour rules (see: classify_pixels), default = COLOUR_RULES
+    Outputs:
+        <output_dir>/<image name>/: outputs of each image (see: process_map)
+        <output_dir>/summary.csv: one row per image and colour (see: process_map)
+    Returns:
+        summary (DataFrame): contents of summary.csv
+    """
+    import glob, time
+    from concurrent.futures import ProcessPoolExecutor
+    if os.path.isdir(maps):
+        files = [name for extension in ('png', 'jpg', 'jpeg') for name in glob.glob(os.path.join(maps, f'*.{extension}'))]
+    else:
+        files = glob.glob(maps)
+    files.sort()
+
+    folders, used = [], set()
+    for name in files:                                                  # Images with the same name (from different folders) get numbered folders
+        stem = os.path.splitext(os.path.basename(name))[0]
+        folder, number = stem, 1
+        while folder in used:                                           # The numbered name may itself be another image's name (foo_2.png)
+            number += 1
+            folder = f'{stem}_{number}'
+        used.add(folder)
+        folders.append(os.path.join(output_dir, folder))
 
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(process_map, files, folders, [rules] * len(files)))
+    seconds = time.perf_counter() - start
 
+    os.makedirs(output_dir, exist_ok=True)
+    summary = pd.DataFrame([row for rows in results for row in rows],
+                           columns=['image', 'colour', 'pixels', 'components', 'largest_component', 'seconds'])
+    summary.to_csv(os.path.join(output_dir, 'summary.csv'), index=False)
+    print('File saved as: ' + os.path.join('.', output_dir, 'summary.csv'))
+    print(f'Processed {len(files)} images in {seconds:.2f} s ({len(files) / seconds if seconds else 0:.2f} images per second)')
+    return summary
@@ -45,7 +45,7 @@ def main_menu():
         else:
             valid = False
     
-def reporting_menu():
+def reporting_menu(all_data=None):
     """
     Procedure to access monitoring menu
 
@@ -56,9 +56,13 @@ def reporting_menu():
             C: Find hourly average
             D: Find monthly average
             E: Find peak hour for selected date
+
+    Arguments:
+        all_data (DataFrame): pollutant data (see: reporting.import_data), default = None (imported on entry)
     """
     import reporting                                                          
-    all_data = reporting.import_data()
+    if all_data is None:
+        all_data = reporting.import_data()
     selection_complete = False
     while selection_complete == False:
         site_valid = False
@@ -128,28 +132,28 @@ def reporting_menu():
                 operation_valid = True
                 print(reporting.daily_average(all_data, site, pollutant))
                 time.sleep(1)
-                return reporting_menu()
+                return reporting_menu(all_data)
             elif prompt.lower() == 'b':
                 operation_valid = True
                 print(reporting.daily_median(all_data, site, pollutant))
                 time.sleep(1)
-                return reporting_menu()                
+                return reporting_menu(all_data)                
             elif prompt.lower() == 'c':
                 operation_valid = True
                 print(reporting.hourly_average(all_data, site, pollutant))
                 time.sleep(1)
-                return reporting_menu()                
+                return reporting_menu(all_data)                
             elif prompt.lower() == 'd':
                 operation_valid = True
                 print(reporting.monthly_average(all_data, site, pollutant))  
                 time.sleep(1)
-                return reporting_menu() 
+                return reporting_menu(all_data) 
             elif prompt.lower() == 'e':    
                 operation_valid = True                                               
                 sel_date = select_date(0)
                 print(reporting.peak_hour_date(all_data,sel_date,site,pollutant))
                 time.sleep(1)
-                return reporting_menu()
+                return reporting_menu(all_data)
             else:
                 operation_valid = False
 
@@ -200,7 +204,7 @@ def select_date(order):
     sel_time = str(year) + '-' + str(month) + '-' + str(day)
     return sel_time
 
-def monitoring_menu():
+def monitoring_menu(frame=None):
     """
     Procedure to access monitoring menu
 
@@ -209,9 +213,11 @@ def monitoring_menu():
         B: Print request as formatted table
         C: Print request as graph
         D: Change date range of request
+
+    Arguments:
+        frame (DataFrame): last requested data (see: monitoring.cached_data), default = None (requested when first needed)
     """
     import monitoring,time
-    request = monitoring.get_live_data_from_api()
     choice = False
     while choice == False:
         prompt = input('_'*59 + '\n\n[Enter Q to go back to main menu]' + '\n'*3 + 
@@ -228,16 +234,18 @@ def monitoring_menu():
             species = input("Input species code: ")
             start_date = select_date(0)
             end_date = select_date(1)
-            request = monitoring.get_live_data_from_api(code,species,start_date,end_date)
             print('Warning: Selecting a large range of time may take longer to request')
-            return monitoring_menu()
+            frame = monitoring.cached_data(code,species,start_date,end_date)     # Only days not requested before are downloaded
+            return monitoring_menu(frame)
         elif prompt.lower() == 'b':
             choice = True
-            monitoring.special_print(monitoring.parse_json(request))
+            frame = monitoring.cached_data() if frame is None else frame
+            monitoring.special_print(frame)
             time.sleep(4)
-            return monitoring_menu()
+            return monitoring_menu(frame)
         elif prompt.lower() == 'c':
             choice = True
+            frame = monitoring.cached_data() if frame is None else frame
             schoice = False
             while schoice == False:
                 prompt = input('_'*59 + '\n\n[Enter Q to go back to main menu]' + '\n'*3 + 
@@ -249,19 +257,19 @@ def monitoring_menu():
                                             '_'*59 + '\n\nChoice (A,B,C): ')
                 if prompt.lower() == 'a':
                     schoice = True 
-                    monitoring.text_graph(monitoring.parse_json(request),view=0)
+                    monitoring.text_graph(frame,view=0)
                     time.sleep(2)
-                    return monitoring_menu()
+                    return monitoring_menu(frame)
                 elif prompt.lower() == 'b':
                     schoice = True 
-                    monitoring.text_graph(monitoring.parse_json(request),view=1)
+                    monitoring.text_graph(frame,view=1)
                     time.sleep(2)
-                    return monitoring_menu()
+                    return monitoring_menu(frame)
                 elif prompt.lower() == 'c':
                     schoice = True 
-                    monitoring.text_graph(monitoring.parse_json(request),view=2)
+                    monitoring.text_graph(frame,view=2)
                     time.sleep(2)
-                    return monitoring_menu()
+                    return monitoring_menu(frame)
                 elif prompt.lower() == 'q':
                     schoice = True
                     return main_menu()
@@ -269,6 +277,7 @@ def monitoring_menu():
                     schoice = False
         elif prompt.lower() == 'd':
             choice = True 
+            frame = monitoring.cached_data() if frame is None else frame
             begin = select_date(0)
             end = select_date(1)
             tvalid = False
@@ -278,8 +287,8 @@ def monitoring_menu():
                 elif interval == 'D': tvalid = True
                 elif interval == 'H': tvalid = True
                 else: tvalid = False
-            monitoring.time_aggregate(monitoring.parse_json(request), datetime.date.strftime(begin, format="%Y-%m-%d"), datetime.date.strftime(end, format="%Y-%m-%d"))
-            return monitoring_menu()
+            monitoring.time_aggregate(frame.copy(), datetime.date.strftime(begin, format="%Y-%m-%d"), datetime.date.strftime(end, format="%Y-%m-%d"))
+            return monitoring_menu(frame)
         elif prompt.lower() == 'q':
             choice = True
             return main_menu()
@@ -294,6 +303,7 @@ def intelligence_menu():
         A: Find red pixels
         B: Find cyan pixels
         C: Find connected components
+        D: Batch process a folder of map images
     """
     import intelligence,os.path
     choice = False
@@ -303,8 +313,9 @@ def intelligence_menu():
                                             ' '*8 + 'Select data below to begin:\n\n' +
                                             ' '*8 + 'A - Find red pixels\n' +
                                             ' '*8 + 'B - Find cyan pixels\n' +
-                                            ' '*8 + 'C - Find connected components\n\n' +
-                                            '_'*59 + '\n\nChoice (A,B,C): ')
+                                            ' '*8 + 'C - Find connected components\n' +
+                                            ' '*8 + 'D - Batch process map images\n\n' +
+                                            '_'*59 + '\n\nChoice (A,B,C,D): ')
         if prompt.lower() == 'a':   
             choice = True 
             intelligence.find_red_pixels('data/map.png')
@@ -339,6 +350,11 @@ def intelligence_menu():
                     return main_menu()
                 else:
                     schoice = False
+        elif prompt.lower() == 'd':
+            choice = True
+            maps = input("Input folder or file pattern of map images: ")
+            intelligence.batch_process_maps(maps)
+            return intelligence_menu()
         elif prompt.lower() == 'q':
             choice = True
             return main_menu()
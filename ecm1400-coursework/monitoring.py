@@ -1,119 +1,546 @@
 import pandas as pd
 import numpy as np
 import datetime
+import codecs
+import json
+import os
+import re
 
 
-def get_live_data_from_api(site_code='MR8',species_code='PM10',start_date=None,end_date=None):
+API_URL = 'https://api.erg.ic.ac.uk/AirQuality'
+ENDPOINT = '{base_url}/Data/SiteSpecies/SiteCode={site_code}/SpeciesCode={species_code}/StartDate={start_date}/EndDate={end_date}/Json'
+RETRY_STATUS = (429, 500, 502, 503, 504)                            # Responses worth retrying (rate limited / server errors)
+_sessions = {}                                                      # (pool size, retries, backoff) -> shared session
+
+def _session(pool_size:int=10, retries:int=3, backoff:float=0.5):
+    """
+    Returns a requests session whose connections are kept open and reused, creating it on first use
+    Failed connections and RETRY_STATUS responses are retried up to retries times, waiting backoff x 2^n seconds in between
+
+    Arguments:
+        pool_size (int): number of connections kept per host
+        retries (int): number of retries
+        backoff (float): backoff factor in seconds
+    Returns:
+        session (requests.Session): shared session
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    if (pool_size, retries, backoff) not in _sessions:
+        retry = Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUS, allowed_methods=['GET'], raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _sessions[(pool_size, retries, backoff)] = session
+    return _sessions[(pool_size, retries, backoff)]
+
+def _request_url(site_code:str, species_code:str, start_date, end_date, base_url:str=API_URL) -> str:
+    """
+    Builds the AirQuality API address of one site, species and date range
+
+    Arguments:
+        site_code (str): site code (e.g. MR8)
+        species_code (str): species code (e.g. PM10)
+        start_date, end_date (date): date range
+        base_url (str): address of the AirQuality API, default = API_URL
+    Returns:
+        url (str): request address
+    """
+    return ENDPOINT.format(base_url=base_url.rstrip('/'), site_code=site_code, species_code=species_code,
+                           start_date=start_date, end_date=end_date)
+
+def get_live_data_from_api(site_code='MR8',species_code='PM10',start_date=None,end_date=None,base_url:str=API_URL,timeout:float=30):
     """
     Return data from the LondonAir API using its AirQuality API. 
     
-    *** This function is provided as an example of how to retrieve data from the API. ***
+    Requests go through a shared session (see: _session), so connections are reused and failed requests are retried.
     It requires the `requests` library which needs to be installed. 
-    In order to use this function you first have to install the `requests` library.
-    This code is provided as-is. 
+
+    Arguments:
+        site_code (str): site code, default = MR8
+        species_code (str): species code, default = PM10
+        start_date (date): first day, default = 2022-01-01
+        end_date (date): day after the last day, default = start_date + 1 day
+        base_url (str): address of the AirQuality API (e.g. a local stub server), default = API_URL
+        timeout (float): seconds to wait for the server, default = 30
+    Returns:
+        json_data (dict): json dictionary
     """
-    import requests
-    import datetime
     start_date = datetime.date(2022,1,1) if start_date is None else start_date
     end_date = start_date + datetime.timedelta(days=1)if end_date is None else end_date
-
-    
-    endpoint = "https://api.erg.ic.ac.uk/AirQuality/Data/SiteSpecies/SiteCode={site_code}/SpeciesCode={species_code}/StartDate={start_date}/EndDate={end_date}/Json"
-   
-    url = endpoint.format(
-        site_code = site_code,
-        species_code = species_code,
-        start_date = start_date,
-        end_date = end_date
-    )
-    
-    res = requests.get(url)
+    res = _session().get(_request_url(site_code, species_code, start_date, end_date, base_url), timeout=timeout)
+    res.raise_for_status()
     return res.json()
 
-def parse_json(json_data:dict) -> pd.DataFrame:
+def date_chunks(start_date:datetime.date, end_date:datetime.date, days:int=31) -> list:
+    """
+    Splits a date range into consecutive ranges of at most days days
+
+    Arguments:
+        start_date (date): first day
+        end_date (date): day after the last day
+        days (int): largest number of days in a range, default = 31
+    Returns:
+        chunks (list): (start, end) of each range
+    """
+    chunks = []
+    while start_date < end_date:
+        chunk_end = min(start_date + datetime.timedelta(days=days), end_date)
+        chunks.append((start_date, chunk_end))
+        start_date = chunk_end
+    return chunks
+
+def fetch_many(queries:list, base_url:str=API_URL, workers:int=8, chunk_days:int=31, timeout:float=30,
+               retries:int=3, backoff:float=0.5, keep_failed:bool=False) -> dict:
+    """
+    Requests many site x species x date range queries at once. Each date range is split into chunks (see: date_chunks),
+    and at most workers chunks are requested at a time by a thread pool sharing one session (see: _session)
+    A chunk that still fails after its retries is reported and left out, or kept as None if keep_failed is True
+
+    Arguments:
+        queries (list): (site code, species code, start date, end date) of each query
+        base_url (str): address of the AirQuality API (e.g. a local stub server), default = API_URL
+        workers (int): largest number of requests in flight, default = 8
+        chunk_days (int): largest number of days per request, default = 31
+        timeout (float): seconds to wait for the server, default = 30
+        retries (int): retries per request, default = 3
+        backoff (float): backoff factor of retries in seconds, default = 0.5
+        keep_failed (bool): default = False; if True, failed chunks are None, so payloads line up with date_chunks
+    Returns:
+        payloads (dict): query -> list of json dictionaries, one per chunk in date order
+    Outputs:
+        prints a message for each failed request
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    session = _session(workers, retries, backoff)
+
+    def fetch(url):
+        try:
+            res = session.get(url, timeout=timeout)
+            res.raise_for_status()
+            return res.json()
+        except Exception as e:
+            print(f'Request failed: {url} ({e})')
+            return None
+
+    queries = [tuple(query) for query in queries]
+    urls = [[_request_url(site, species, start, end, base_url) for start, end in date_chunks(first, last, chunk_days)]
+            for site, species, first, last in queries]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = iter(list(pool.map(fetch, [url for query_urls in urls for url in query_urls])))
+    return {query: [payload for payload in (next(results) for _ in query_urls) if keep_failed or payload is not None]
+            for query, query_urls in zip(queries, urls)}
+
+API_CACHE_DIR = 'data/.cache/api'
+
+def _day_number(day) -> int:
+    """
+    Converts a date (or date string) into the number of days since 1970-01-01
+
+    Arguments:
+        day (date | str): date
+    Returns:
+        number (int): days since 1970-01-01
+    """
+    return int(np.datetime64(pd.Timestamp(day).date(), 'D').astype(np.int64))
+
+def _payload_columns(json_data:dict) -> tuple:
+    """
+    Reads the measurement times and values of an API response into arrays; empty values become NaN
+
+    Arguments:
+        json_data (dict): json dictionary (see: get_live_data_from_api)
+    Returns:
+        times (ndarray): measurement times (datetime64[ns])
+        values (ndarray): measurement values (float64)
+    """
+    data = json_data['RawAQData'].get('Data') or []
+    if isinstance(data, dict):                                      # A single reading is not wrapped in a list
+        data = [data]
+    return _record_columns([reading['@MeasurementDateGMT'] for reading in data], [reading['@Value'] for reading in data])
+
+def _record_columns(dates:list, values:list) -> tuple:
+    """
+    Converts the measurement dates and values of API records (strings) into typed arrays; empty values become NaN
+
+    Arguments:
+        dates (list): '@MeasurementDateGMT' of every record
+        values (list): '@Value' of every record
+    Returns:
+        times (ndarray): measurement times (datetime64[ns])
+        values (ndarray): measurement values (float64)
+    """
+    times = pd.to_datetime(dates, format='%Y-%m-%d %H:%M:%S')
+    values = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+    return times.to_numpy(dtype='datetime64[ns]'), values.to_numpy(dtype=np.float64)
+
+def _cache_file(site_code:str, species_code:str, cache_dir:str=API_CACHE_DIR) -> str:
+    """
+    Returns the path of the cache file of one site and species
+
+    Arguments:
+        site_code (str): site code
+        species_code (str): species code
+        cache_dir (str): cache folder, default = API_CACHE_DIR
+    Returns:
+        filename (str): path to .npz file
+    """
+    return os.path.join(cache_dir, f'{site_code}_{species_code}.npz')
+
+def _load_cached(filename:str) -> tuple:
+    """
+    Loads the cached readings of one site and species, or empty arrays when there is no cache
+
+    Arguments:
+        filename (str): path to .npz file (see: _cache_file)
+    Returns:
+        days (ndarray): complete days (days since 1970-01-01)
+        times (ndarray): measurement times (datetime64[ns])
+        values (ndarray): measurement values (float64, NaN if missing)
+    """
+    if not os.path.exists(filename):
+        return np.array([], dtype=np.int64), np.array([], dtype='datetime64[ns]'), np.array([], dtype=np.float64)
+    with np.load(filename) as cache:
+        return cache['days'], cache['times'], cache['values']
+
+def _save_cached(filename:str, days:np.ndarray, times:np.ndarray, values:np.ndarray):
+    """
+    Saves the readings of one site and species as columns, writing to a temporary file first so a cache is never half-written
+
+    Arguments:
+        filename (str): path to .npz file (see: _cache_file)
+        days (ndarray): complete days (days since 1970-01-01)
+        times (ndarray): measurement times (datetime64[ns])
+        values (ndarray): measurement values (float64)
+    """
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    temporary = filename + '.tmp.npz'
+    np.savez(temporary, days=days, times=times, values=values)
+    os.replace(temporary, filename)
+
+def cached_data(site_code:str='MR8', species_code:str='PM10', start_date=None, end_date=None, cache_dir:str=API_CACHE_DIR,
+                base_url:str=API_URL, workers:int=8) -> pd.DataFrame:
+    """
+    Returns the readings of a site and species for a date range, requesting only the days that are not cached yet
+    Readings are cached per site and species as columns (see: _save_cached). Days before today (GMT) are marked complete
+    once fetched; today and later days are fetched again next time, as are days whose request failed. Cached readings
+    are only replaced by those of chunks that arrived
+
+    Arguments:
+        site_code (str): site code, default = MR8
+        species_code (str): species code, default = PM10
+        start_date (date | str): first day, default = 2022-01-01
+        end_date (date | str): day after the last day, default = start_date + 1 day
+        cache_dir (str): cache folder, default = API_CACHE_DIR
+        base_url (str): address of the AirQuality API, default = API_URL
+        workers (int): largest number of requests in flight (see: fetch_many)
+    Returns:
+        aq_data (DataFrame): indexed by Date, with Site, Pollutant and Value columns (see: parse_json), without missing values
+    """
+    first = _day_number(datetime.date(2022,1,1) if start_date is None else start_date)
+    last = first + 1 if end_date is None else _day_number(end_date)
+    filename = _cache_file(site_code, species_code, cache_dir)
+    days, times, values = _load_cached(filename)
+
+    missing = np.setdiff1d(np.arange(first, last), days)
+    if len(missing):
+        breaks = np.nonzero(np.diff(missing) > 1)[0]                # Groups missing days into consecutive ranges
+        ranges = zip(missing[np.append(0, breaks + 1)], missing[np.append(breaks, len(missing) - 1)] + 1)
+        to_date = lambda number: np.datetime64(int(number), 'D').astype(datetime.date)
+        queries = [(site_code, species_code, to_date(begin), to_date(end)) for begin, end in ranges]
+        payloads = fetch_many(queries, base_url, workers, keep_failed=True)
+        today = _day_number(datetime.datetime.now(datetime.timezone.utc).date())
+        stale = np.zeros(len(times), dtype=bool)                    # Earlier readings of the days fetched again
+        new_times, new_values, complete = [], [], [days]
+        for (_, _, begin, end), chunks in payloads.items():
+            for (chunk_begin, chunk_end), chunk in zip(date_chunks(begin, end), chunks):
+                if chunk is None:                                   # Failed: cached readings of its days are kept
+                    continue
+                stale |= (times >= np.datetime64(chunk_begin, 'D')) & (times < np.datetime64(chunk_end, 'D'))
+                chunk_times, chunk_values = _payload_columns(chunk)
+                new_times.append(chunk_times)
+                new_values.append(chunk_values)
+                complete.append(np.arange(_day_number(chunk_begin), min(_day_number(chunk_end), today)))
+        times = np.concatenate([times[~stale]] + new_times)
+        values = np.concatenate([values[~stale]] + new_values)
+        order = np.argsort(times, kind='stable')
+        times, values = times[order], values[order]
+        days = np.unique(np.concatenate(complete)).astype(np.int64)
+        _save_cached(filename, days, times, values)
+
+    selected = (times >= np.datetime64(first, 'D')) & (times < np.datetime64(last, 'D'))
+    return _aq_frame(site_code, species_code, times[selected], values[selected])
+
+def _aq_frame(sites, species, times:np.ndarray, values:np.ndarray) -> pd.DataFrame:
+    """
+    Builds the monitoring dataframe from columns, leaving out missing values
+
+    Arguments:
+        sites, species (str | ndarray): site and species code of every reading (or one code for all)
+        times (ndarray): measurement times (datetime64[ns])
+        values (ndarray): measurement values (float64, NaN if missing)
+    Returns:
+        aq_data (DataFrame): indexed by Date, with Site, Pollutant and Value columns
+    """
+    present = ~np.isnan(values)
+    select = lambda column: column if np.isscalar(column) else column[present]
+    return pd.DataFrame({'Site': select(sites), 'Pollutant': select(species), 'Value': values[present]},
+                        index=pd.DatetimeIndex(times[present], name='Date'))
+
+def parse_json(json_data) -> pd.DataFrame:
     """
     Parses data from json format into dataframe:
 
-        1: Splits 'Data' column into two according to date and value
-        2: Renames columns with appropriate values
-        3: Converts 'Date' column data from string to datetime object
-        4: Sets date as the index of the dataframe
-        5: Sets value column as float
-        6: Discards all missing data values
+        1: Reads the date and value of every record in 'Data' into typed arrays (see: _payload_columns)
+        2: Repeats the site and species codes of each response for its records
+        3: Sets date as the index of the dataframe (DatetimeIndex)
+        4: Discards all missing data values
+
+    Arguments:
+        json_data (dict | list): json dictionary (output, see: get_live_data_from_api), or a list of them (e.g. several sites)
+    Returns:
+        aq_data: dataframe with Site, Pollutant and Value columns, indexed by Date
+    """
+    payloads = [json_data] if isinstance(json_data, dict) else list(json_data)
+    columns = [_payload_columns(payload) for payload in payloads]                                   #1
+    counts = [len(times) for times, _ in columns]
+    sites = np.repeat([payload['RawAQData']['@SiteCode'] for payload in payloads], counts).astype(object)      #2
+    species = np.repeat([payload['RawAQData']['@SpeciesCode'] for payload in payloads], counts).astype(object)
+    times = np.concatenate([times for times, _ in columns]) if columns else np.array([], dtype='datetime64[ns]')
+    values = np.concatenate([values for _, values in columns]) if columns else np.array([], dtype=np.float64)
+    return _aq_frame(sites, species, times, values)                                                  #3, 4
+
+_DATA_OPENING = re.compile(r'\s*:\s*(\S)')                           # Colon after "Data" and the character opening its value
+_SEPARATORS = re.compile(r'[\s,]*')                                  # Whitespace and commas between records
+
+def _read_text(stream, chunk_size:int, decoder):
+    """
+    Reads the next chunk of a text or binary stream as text (None at the end of the stream)
+    """
+    chunk = stream.read(chunk_size)
+    if not chunk:
+        return None
+    return chunk if isinstance(chunk, str) else decoder.decode(chunk)
+
+def iter_json_batches(stream, batch_size:int=10000, chunk_size:int=65536):
+    """
+    Parses an API response incrementally, yielding its records in dataframes of at most batch_size readings
+    Only the current chunk and batch are held in memory, so the size of the response does not matter:
+
+        1: Reads chunks until the start of 'Data', taking the site and species codes from the fields before it
+        2: Decodes one record at a time, reading another chunk whenever a record is cut off
+        3: Converts every batch_size records into typed columns (see: _record_columns, _aq_frame)
+
+    The API puts '@SiteCode' and '@SpeciesCode' before 'Data'; codes that come after it are not read (Site/Pollutant = None).
 
     Arguments:
-        json_data (dict): json dictionary (output, see: get_live_data_from_api)
+        stream (file): binary or text file object, e.g. open(filename, 'rb') or the raw socket of a response (see: stream_live_data)
+        batch_size (int): readings per batch, default = 10000
+        chunk_size (int): characters (bytes) read at a time, default = 65536
     Returns:
-        aq_data: dataframe with rearranged data values
+        batches (generator): dataframes in the format of parse_json
+    Raises:
+        ValueError: if the stream ends in the middle of the data
     """
-    aq_data = pd.DataFrame(json_data['RawAQData'])
-    aq_data = pd.concat([aq_data.drop(['Data'], axis=1), aq_data['Data'].apply(pd.Series)], axis=1) #1
-    aq_data = aq_data.rename(columns={"@SiteCode": "Site", "@SpeciesCode": "Pollutant", "@MeasurementDateGMT": "Date", "@Value": "Value"}) #2
-    aq_data.loc['Date'] = pd.to_datetime(aq_data['Date'], format='%Y-%m-%d %H:%M:%S') #3
-    aq_data = aq_data.set_index('Date') #4
-    aq_data = aq_data.replace(r'^\s*$', np.nan, regex=True)
-    aq_data['Value'] = aq_data['Value'].astype(float)  #5
-    aq_data = aq_data.dropna() #6
-    return aq_data
+    decoder, text_decoder = json.JSONDecoder(), codecs.getincrementaldecoder('utf-8')()
+    buffer, opening = '', None
+    while opening is None:                                                                           #1
+        start = buffer.find('"Data"')
+        if start >= 0:
+            match = _DATA_OPENING.match(buffer, start + 6)
+            opening = match.start(1) if match else None
+        if opening is None:
+            chunk = _read_text(stream, chunk_size, text_decoder)
+            if chunk is None:                                       # No data at all
+                return
+            buffer += chunk
+    fields = dict(re.findall(r'"(@\w+)"\s*:\s*"([^"]*)"', buffer[:start]))
+    site, species = fields.get('@SiteCode'), fields.get('@SpeciesCode')
+    if buffer[opening] not in '[{':                                 # "Data": null
+        return
+    single = buffer[opening] == '{'                                 # A single reading is not wrapped in a list
+    position = opening if single else opening + 1
+    dates, values = [], []
+    while True:
+        position = _SEPARATORS.match(buffer, position).end()
+        if position < len(buffer) and buffer[position] == ']':
+            break
+        try:
+            record, position = decoder.raw_decode(buffer, position)                                  #2
+        except json.JSONDecodeError:
+            chunk = _read_text(stream, chunk_size, text_decoder)
+            if chunk is None:
+                raise ValueError('Incomplete JSON: the stream ended in the middle of the data')
+            buffer, position = buffer[position:] + chunk, 0
+            continue
+        dates.append(record['@MeasurementDateGMT'])
+        values.append(record['@Value'])
+        if len(dates) >= batch_size:
+            yield _aq_frame(site, species, *_record_columns(dates, values))                          #3
+            dates, values = [], []
+        if single:
+            break
+    if dates:
+        yield _aq_frame(site, species, *_record_columns(dates, values))
 
-def special_print(dataframe:pd.DataFrame):
+def stream_live_data(site_code='MR8', species_code='PM10', start_date=None, end_date=None, base_url:str=API_URL,
+                     timeout:float=30, batch_size:int=10000):
+    """
+    Streams data from the LondonAir API, parsing the response as it arrives (see: iter_json_batches)
+    Unlike get_live_data_from_api the response is never held in memory whole, so long date ranges can be requested at once.
+
+    Arguments:
+        site_code (str): site code, default = MR8
+        species_code (str): species code, default = PM10
+        start_date (date): first day, default = 2022-01-01
+        end_date (date): day after the last day, default = start_date + 1 day
+        base_url (str): address of the AirQuality API (e.g. a local stub server), default = API_URL
+        timeout (float): seconds to wait for the server, default = 30
+        batch_size (int): readings per batch, default = 10000
+    Returns:
+        batches (generator): dataframes in the format of parse_json
+    """
+    start_date = datetime.date(2022,1,1) if start_date is None else start_date
+    end_date = start_date + datetime.timedelta(days=1) if end_date is None else end_date
+    res = _session().get(_request_url(site_code, species_code, start_date, end_date, base_url), timeout=timeout, stream=True)
+    with res:
+        res.raise_for_status()
+        res.raw.decode_content = True                               # Undo gzip compression, if any
+        yield from iter_json_batches(res.raw, batch_size)
+
+def aggregate_batches(batches, interval:str='D') -> pd.DataFrame:
+    """
+    Aggregates batches of readings (see: iter_json_batches) as they arrive, keeping only running totals per period
+
+    Arguments:
+        batches (iterable): dataframes in the format of parse_json
+        interval (str): period of the aggregate ('H' = hourly, 'D' = daily, 'M' = monthly, 'Y' = yearly), default = 'D'
+    Returns:
+        aggregate (DataFrame): count, mean, min and max of the values, indexed by Site, Pollutant and Period
+    """
+    totals = None
+    combine = {'count': 'sum', 'sum': 'sum', 'min': 'min', 'max': 'max'}
+    for batch in batches:
+        period = batch.index.to_period(interval).rename('Period')
+        part = batch.groupby(['Site', 'Pollutant', period], dropna=False)['Value'].agg(['count', 'sum', 'min', 'max'])
+        totals = part if totals is None else pd.concat([totals, part]).groupby(level=[0, 1, 2], dropna=False).agg(combine)
+    if totals is None:
+        index = pd.MultiIndex.from_arrays([[], [], pd.PeriodIndex([], freq=interval)], names=['Site', 'Pollutant', 'Period'])
+        totals = pd.DataFrame({'count': [], 'sum': [], 'min': [], 'max': []}, index=index)
+    totals.insert(1, 'mean', totals.pop('sum') / totals['count'])
+    return totals
+
+def special_print(dataframe:pd.DataFrame, max_rows:int=None, mode:str='head', page:int=None, file=None):
     """
     Displays data from dataframe in text-based table format
 
+        1: Picks the rows to show: all of them, one page of max_rows, or max_rows from the head and/or tail
+        2: Converts each column to text and pads it to its width in one go (header or longest value, whichever is longer)
+        3: Joins the padded columns into lines and writes the whole table at once
+
+    The dataframe is not modified.
+
     Arguments:
         dataframe: parsed dataframe (see: parse_json())
+        max_rows (int): most rows to show, default = None (all rows)
+        mode (str): rows shown when there are more than max_rows: 'head' (first), 'tail' (last) or 'both' (half of each), default = 'head'
+        page (int): if given, shows rows page x max_rows to (page + 1) x max_rows instead of using mode (pages start at 0)
+        file (file): where to write the table, default = sys.stdout
+    Raises:
+        ValueError: if mode is not 'head', 'tail' or 'both'
     """
-    columns = dataframe.columns.tolist()                            # Adds headers of dataframe into list
-    columns.insert(0,dataframe.index.name)
-    dataframe['Value'] = dataframe['Value'].astype(str)
-    
-    date_cl = int(dataframe.index.str.len().max())
-    site_cl = int(dataframe['Site'].str.len().max())
-    pollutant_cl = int(dataframe['Pollutant'].str.len().max())
-    value_cl = int(dataframe['Value'].str.len().max())
-    cl = [date_cl,site_cl,pollutant_cl,value_cl]                    # Generates list of column widths based on data length
-
-    for x in range(len(columns)):                                   # Finds whichever is longer: header length or data length
-        if len(columns[x]) > cl[x]:
-            cl[x] = len(columns[x])
-
-    hline,header = [],[]
-    for i in range(len(cl)):                                        # Generate header/footer lines, spaced by values in list (cl)
-        hline.append('+')
-        hline.append('-'*int(cl[i]+4))
-        header.append(columns[i] + ' '*int(cl[i]-len(columns[i])))
-    hline.append('+')
-    
+    import sys
+    if mode not in ('head', 'tail', 'both'):
+        raise ValueError(f"unknown mode '{mode}'")
+    total = len(dataframe.index)
+    gap = None                                                      # Position of the '...' row between head and tail
+    if max_rows is not None and page is not None:                   #1
+        dataframe = dataframe.iloc[page * max_rows:(page + 1) * max_rows]
+    elif max_rows is not None and total > max_rows:
+        if mode == 'tail':
+            dataframe = dataframe.iloc[total - max_rows:]
+        elif mode == 'both':
+            gap = (max_rows + 1) // 2
+            dataframe = pd.concat([dataframe.iloc[:gap], dataframe.iloc[total - (max_rows - gap):]])
+        else:
+            dataframe = dataframe.iloc[:max_rows]
+
+    headers = [str(dataframe.index.name or '')] + [str(column) for column in dataframe.columns]
+    cells = [pd.Series(dataframe.index.astype(str), dtype=object)]                                    #2
+    cells += [dataframe.iloc[:, i].astype(str).reset_index(drop=True) for i in range(dataframe.shape[1])]
+    if gap is not None:
+        cells = [pd.concat([column[:gap], pd.Series(['...']), column[gap:]], ignore_index=True) for column in cells]
+    cl = [max(len(header), int(column.str.len().max()) if len(column) else 0) for header, column in zip(headers, cells)]
+    padded = [column.str.ljust(width).to_numpy(dtype=object) for column, width in zip(cells, cl)]
+
     rl_start,rl_end,rl_mid = '|  ','  |','  |  '                    # Row line strings (used to construct separators)
+    hline = '+' + '+'.join('-' * (width + 4) for width in cl) + '+'
+    header = rl_start + rl_mid.join(header.ljust(width) for header, width in zip(headers, cl)) + rl_end
+    rows = padded[0]
+    for column in padded[1:]:                                       # Element-wise concatenation of whole columns
+        rows = rows + rl_mid + column
+    lines = [hline, header, hline] + (rl_start + rows + rl_end).tolist() + [hline]
+    if len(dataframe.index) < total:
+        lines.append(f'({len(dataframe.index)} of {total} rows)')
+    (sys.stdout if file is None else file).write('\n'.join(lines) + '\n')                             #3
+
+BAR = '\u25ae'
+BAR_COLOURS = {'green': '\033[0m\033[0;32m\u25ae\033[0;32m\033[0m', 'yellow': '\033[0m\033[1;33m\u25ae\033[1;33m\033[0m',
+               'red': '\033[0m\033[0;31m\u25ae\033[0;31m\033[0m'}
+
+def _bucket(values:np.ndarray, width:int, how:str='max') -> np.ndarray:
+    """
+    Reduces a series to at most width values, combining runs of neighbouring values (missing values are ignored)
+
+    Arguments:
+        values (ndarray): series (float)
+        width (int): most values to return
+        how (str): 'max', 'min' or 'mean' of each run, default = 'max'
+    Returns:
+        buckets (ndarray): one value per run (NaN if the run has no values)
+    """
+    if len(values) <= width:
+        return values
+    starts = np.linspace(0, len(values), width + 1).astype(np.int64)[:-1]
+    if how == 'mean':
+        present = ~np.isnan(values)
+        counts = np.add.reduceat(present, starts)
+        sums = np.add.reduceat(np.where(present, values, 0.0), starts)
+        return np.divide(sums, counts, out=np.full(width, np.nan), where=counts > 0)
+    reduce = {'max': np.fmax, 'min': np.fmin}[how]                  # fmax / fmin skip NaN
+    return reduce.reduceat(values, starts)
 
-    print(''.join(hline))
-    print(rl_start + rl_mid.join(header) + rl_end)
-    print(''.join(hline))
-    for row in range(len(dataframe.index)):                         # For each row pad values with sufficient space (whitespace width: column width - data width)
-        row_list = dataframe.iloc[row].tolist()
-        row_list.insert(0,dataframe.index[row]) #
-        for i in range(len(cl)):
-             if len(row_list[i]) < cl[i]:
-                row_list[i] = str(row_list[i]) + str(' '*int(cl[i]-len(row_list[i])))
-        print(rl_start + rl_mid.join(row_list) + rl_end)
-    print(''.join(hline))
-       
-def text_graph(dataframe:pd.DataFrame,height:int=10,view:int=0):
+def text_graph(dataframe:pd.DataFrame,height:int=10,view:int=0,width:int=None,how:str='max',file=None):
     """
     Generates text-based graph based on input dataframe
     Can generate multiple views:
         view = 0: normal graph
         view = 1: coloured bars by time
         view = 2: coloured bars by value
+
+    Series longer than the graph width are bucketed so each bar covers a run of readings (see: _bucket).
+    Every row of the graph is one comparison of the bar heights against its level, and the graph is written at once.
+
     Arguments:
         dataframe: parsed dataframe (see: parse_json())
         height (int): height of bars on graph
         view (int): integer between 0 and 2
+        width (int): most bars on graph, default = terminal width less the y axis
+        how (str): value of a bar covering several readings: 'max', 'min' or 'mean', default = 'max'
+        file (file): where to write the graph, default = sys.stdout
     """
-    max_value = dataframe['Value'].max()                                                # Reads variables from dataframe to generate axes data
-    increment = max_value / height 
-    values = dataframe['Value'].tolist()
-    columns = dataframe.columns.tolist() 
+    import sys, shutil
+    if dataframe.empty:
+        return
+    padding = '     '
+    width = shutil.get_terminal_size().columns - len(padding) if width is None else width
+    values = _bucket(dataframe['Value'].to_numpy(dtype=np.float64), max(width, 1), how)
+    present = values[~np.isnan(values)]
+    max_value = present.max() if len(present) else 0.0                                 # Reads variables from dataframe to generate axes data
+    increment = max_value / height if max_value > 0 else 0.0                            # 0: no value above 0, so every bar is empty
+    columns = dataframe.columns.tolist()
 
     time_start,time_end = dataframe.index[0],dataframe.index[-1]                        # Find the time difference in seconds between start and end time of graph
     time_start = pd.to_datetime(time_start, format='%Y-%m-%d %H:%M:%S')
@@ -124,55 +551,33 @@ def text_graph(dataframe:pd.DataFrame,height:int=10,view:int=0):
     if duration > 3153000:
         time_start,time_end = time_start.strftime("%Y"),time_end.strftime("%Y")         # Displays different time formats based on time interval between start and finish
     elif duration > 2592000:
-        time_start,time_end = time_start.strftime("%b"),time_end.strftime("%b")    
+        time_start,time_end = time_start.strftime("%b"),time_end.strftime("%b")
     elif duration > 86400:
         time_start,time_end = time_start.strftime("%b %d"),time_end.strftime("%b %d")
     else:
         time_start,time_end = time_start.strftime("%H:%M"),time_end.strftime("%H:%M")
 
-    bar_height = [i // increment for i in values]
-    chart_array = np.zeros((len(values),height),dtype='object')                         # Generates 2D array representing graph (y values = rows, x values = columns)
-    for y in range(len(chart_array)):                                                   
-         for x in range(int(bar_height[y])):                                            # Bars are coloured differently dependening on the value of view
-            if view == 2:
-                if x > 5:
-                    chart_array[y,x] = '\033[0m\033[0;31m\u25ae\033[0;31m\033[0m'
-                elif x > 2:
-                    chart_array[y,x] = '\033[0m\033[1;33m\u25ae\033[1;33m\033[0m'
-                else:
-                    chart_array[y,x] = '\033[0m\033[0;32m\u25ae\033[0;32m\033[0m'   
-            elif view == 1:   
-                if int(bar_height[y]) > 6:
-                    chart_array[y,x] = '\033[0m\033[0;31m\u25ae\033[0;31m\033[0m'
-                elif int(bar_height[y]) > 3:
-                    chart_array[y,x] = '\033[0m\033[1;33m\u25ae\033[1;33m\033[0m'
-                else:
-                    chart_array[y,x] = '\033[0m\033[0;32m\u25ae\033[0;32m\033[0m' 
-            elif view == 0:
-                chart_array[y,x] = '\u25ae'
-            else:
-                chart_array[y,x] = '\u25ae'
-            
-    y_axis = np.zeros(height,dtype='object')
-    padding = '     '
-    y_axis[::2] = padding                                       # Alternate values = whitespace
-    for i in range(len(y_axis)):                                # Generates y axis values
-        if y_axis[i] == 0:
-            char = str(round(increment*i,1))
-            y_axis[i] = char + ' '*int(len(padding)-len(char))
-
-    chart_array = np.insert(chart_array,0,y_axis,axis=0)        # Insert y axis into 2D array
-    chart_array = np.swapaxes(chart_array,0,1)                  # Swaps axes (x values = rows, y values = columns)
-    chart_array = np.flip(chart_array, axis = 0)
-    print(columns[0] + ':' + dataframe[columns[0]].iloc[0] + '\n' + columns[1] + ':' + dataframe[columns[1]].iloc[0] + '\n')
-
-    x_axis = np.zeros(int(len(values)+1),dtype='object')
-    x_axis[1:-2] = ' '                                          
-    x_axis[0],x_axis[-1] = time_start,time_end                  # Time values are placed at start and end of the x axis
-    chart_array = np.concatenate((chart_array,[x_axis]),axis=0) # Insert x axis in 2D array
-    chart_array[np.where(chart_array[:] == 0)] = ' '            # Non-bar values = whitespace
-    for row in chart_array:
-        print(''.join(row))
+    bar_height = np.floor_divide(values, increment) if increment > 0 else np.zeros(len(values))    # NaN bars (empty buckets) are never drawn
+    levels = np.arange(height)[::-1, None]                                              # One row per level, top row first
+    filled = levels < bar_height                                                        # 2D array representing graph (levels = rows, bars = columns)
+    symbols = np.array([' ', BAR, BAR_COLOURS['green'], BAR_COLOURS['yellow'], BAR_COLOURS['red']], dtype=object)
+    if view == 2:                                                                       # Bars are coloured differently dependening on the value of view
+        colour = np.select([levels > 5, levels > 2], [4, 3], 2)
+    elif view == 1:
+        colour = np.select([bar_height > 6, bar_height > 3], [4, 3], 2)[None, :]
+    else:
+        colour = np.ones((1, 1), dtype=np.int64)
+    cells = symbols[np.where(filled, colour, 0)]
+
+    y_axis = []
+    for i in range(height):                                     # Generates y axis values (alternate values = whitespace)
+        char = str(round(increment*i,1))
+        y_axis.append(padding if i % 2 == 0 else char + ' '*int(len(padding)-len(char)))
+
+    lines = [columns[0] + ':' + str(dataframe[columns[0]].iloc[0]), columns[1] + ':' + str(dataframe[columns[1]].iloc[0]), '']
+    lines += [y_axis[level] + ''.join(row) for level, row in zip(levels[:, 0], cells)]
+    lines.append(time_start + ' '*(len(values)-1) + time_end)   # Time values are placed at start and end of the x axis
+    (sys.stdout if file is None else file).write('\n'.join(lines) + '\n')
 
 def time_aggregate(dataframe:pd.DataFrame,start_date:datetime.datetime,end_date:datetime.datetime,interval:str) -> pd.DataFrame:
     """
@@ -1,126 +1,961 @@
 import numpy as np
 import pandas as pd
 import datetime
+import glob
+import os
+
+POLLUTANTS = ['no', 'pm10', 'pm25']
+STATION_DTYPES = {'date': str, 'time': str, **{pollutant: float for pollutant in POLLUTANTS}}    # Column types of the station CSVs
+
+def read_station(filename:str) -> pd.DataFrame:
+    """
+    Reads a station CSV with 'No data' entries read as NaN and pollutant columns read directly as float,
+    so no object (string) columns are created for the pollutants
+
+    Arguments:
+        filename (str): path to station CSV
+    Returns:
+        dataframe: original dataframe (see: parse_data)
+    """
+    return pd.read_csv(filename, na_values=['No data'], dtype=STATION_DTYPES)
 
 def parse_data(dataframe:pd.DataFrame) -> pd.DataFrame:
     """
     Modifies the input dataframe in the following ways:
 
-        1: Replaces 'No data' values with NaN in order to make pandas methods work with the dataframe
-        2: Converts pollutants column from string format to float to allow applying functions on each column
-        3: Replaces 24:00:00 with 00:00:00 in order to make data suitable for conversion to datetime object
-        4: Combines date and time columns into one column 'datetime' and converts data into datetime object
-        5: Sets datetime column as the index of the dataframe
+        1: Converts pollutant columns to float, with any 'No data' values as NaN (already done when read with read_station)
+        2: Builds the 'datetime' column arithmetically as date + time of day, parsing each distinct date and time only once;
+           24:00:00 becomes 00:00:00 of the next day
+        3: Sets datetime column as the index of the dataframe
+
+    Readings are timestamped at the end of the hour they cover, so a day's readings run from 01:00 to 24:00 (00:00 of the next day)
 
     Arguments:
         dataframe: original dataframe
     Returns:
         dataframe: modified dataframe   
     """
-    dataframe = dataframe.replace('No data',np.NaN) #1
+    columns = {}
+    for pollutant in POLLUTANTS:                                                    #1
+        values = dataframe[pollutant]
+        columns[pollutant] = values if values.dtype == float else pd.to_numeric(values.replace('No data', np.nan))
+
+    dates = pd.to_datetime(dataframe['date'], format='%Y-%m-%d', cache=True)        #2
+    time_codes, times = pd.factorize(dataframe['time'])                             # Only 24 distinct times of day
+    offsets = pd.to_timedelta(times).to_numpy()[time_codes]                         # '24:00:00' is a whole day
+    index = pd.DatetimeIndex(dates.to_numpy() + offsets, name='datetime')
+
+    return pd.DataFrame(columns).set_index(index)                                   #3
+
+def _station(data:pd.DataFrame, monitoring_station:str) -> pd.DataFrame:
+    """
+    Selects the data of one monitoring station, indexed by the start of the hour each reading covers,
+    so that grouping by day, month or hour of day counts each reading in the period it was measured in
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        monitoring_station (str): selected monitoring station
+    Returns:
+        query (DataFrame): pollutant data of the station
+    """
+    query = data.loc[monitoring_station]
+    return query.set_axis(query.index - pd.Timedelta(hours=1))
+
+STATION_FILES = {
+    'Harlington': 'data/Pollution-London Harlington.csv',
+    'Marylebone Road': 'data/Pollution-London Marylebone Road.csv',
+    'N Kensington': 'data/Pollution-London N Kensington.csv',
+}
+CACHE_FILE = 'data/.cache/reporting.npz'
+CACHE_VERSION = 2                                                   # Increase when parse_data changes, so old caches are rebuilt
+
+def _source_signature(files:list) -> np.ndarray:
+    """
+    Describes the source files by path, modification time and size, so a cache can tell when they have changed
+
+    Arguments:
+        files (list): paths of source files
+    Returns:
+        signature (ndarray): one string per file, plus the cache version
+    """
+    signature = [f'version={CACHE_VERSION}']
+    for name in files:
+        status = os.stat(name)
+        signature.append(f'{name}|{status.st_mtime_ns}|{status.st_size}')
+    return np.array(signature)
 
-    dataframe.no = dataframe.no.astype(float) #2
-    dataframe.pm10 = dataframe.pm10.astype(float)
-    dataframe.pm25 = dataframe.pm25.astype(float)
+def _save_cache(all_data:pd.DataFrame, signature:np.ndarray, filename:str=CACHE_FILE):
+    """
+    Saves the parsed dataframe as uncompressed binary columns (.npz): index levels and codes, and pollutant values
 
-    dataframe.time = dataframe.time.replace('24:00:00', '00:00:00') #3
+    Arguments:
+        all_data (DataFrame): time-indexed pollutant data for all stations (see: import_data)
+        signature (ndarray): signature of the source files (see: _source_signature)
+        filename (str): path to cache file, default = CACHE_FILE
+    Outputs:
+        cache file (written to a temporary file first, so a partly written cache is never read)
+    """
+    os.makedirs(os.path.dirname(filename), exist_ok=True)
+    temporary = filename + '.tmp.npz'
+    np.savez(temporary,
+             signature=signature,
+             stations=np.array(all_data.index.levels[0], dtype=str),
+             station_codes=all_data.index.codes[0],
+             times=all_data.index.levels[1].to_numpy().view(np.int64),
+             time_codes=all_data.index.codes[1],
+             columns=np.array(all_data.columns, dtype=str),
+             values=all_data.to_numpy())
+    os.replace(temporary, filename)
 
-    dataframe.loc[:,'datetime'] = pd.to_datetime(dataframe.date + ' ' + dataframe.time, format='%Y-%m-%d %H:%M:%S') #4
-    dataframe = dataframe.drop(columns=['date','time'])
+def _load_cache(signature:np.ndarray, filename:str=CACHE_FILE) -> pd.DataFrame:
+    """
+    Loads the parsed dataframe from the cache file if it was built from the same source files
 
-    dataframe = dataframe.set_index('datetime') #5
-    return dataframe
+    Arguments:
+        signature (ndarray): signature of the source files (see: _source_signature)
+        filename (str): path to cache file, default = CACHE_FILE
+    Returns:
+        all_data (DataFrame): time-indexed pollutant data for all stations, or None if there is no valid cache
+    """
+    if not os.path.exists(filename):
+        return None
+    with np.load(filename) as cache:
+        if not np.array_equal(cache['signature'], signature):
+            return None
+        times = pd.DatetimeIndex(cache['times'].view('datetime64[ns]'))
+        index = pd.MultiIndex(levels=[cache['stations'], times], codes=[cache['station_codes'], cache['time_codes']],
+                              names=['station', 'datetime'], verify_integrity=False)
+        return pd.DataFrame(cache['values'], index=index, columns=cache['columns'])
 
-def import_data() -> pd.DataFrame:
+def import_data(use_cache:bool=True) -> pd.DataFrame:
     """
     Procedure used to import CSVs from data folder and processes them accordingly:
         
         - Applies parse_data() function on each station
         - Merges dataframes for each station into one large dataframe
 
+    The result is cached in binary columns (CACHE_FILE) and reused until a CSV changes (see: _load_cache)
+
+    Arguments:
+        use_cache (bool): default = True; if False, always parses the CSVs (and does not write the cache)
     Returns:
         all_data: dataframe with time-indexed pollutant data for all stations 
     """
-    data_harlington = pd.read_csv("data/Pollution-London Harlington.csv")       # Import CSV into dataframe
-    data_marylebone = pd.read_csv("data/Pollution-London Marylebone Road.csv")
-    data_kensington = pd.read_csv("data/Pollution-London N Kensington.csv")
+    signature = _source_signature(list(STATION_FILES.values()))
+    if use_cache:
+        all_data = _load_cache(signature)
+        if all_data is not None:
+            return all_data
 
-    data_harlington = parse_data(data_harlington)       # Parse data for each dataframe
-    data_marylebone = parse_data(data_marylebone)
-    data_kensington = parse_data(data_kensington)
-
-    stations_data = [data_harlington, data_marylebone, data_kensington]                                             
-    all_data = pd.concat(stations_data, keys=['Harlington','Marylebone Road','N Kensington'], names=['station'])    # Concatenates dataframes together into one large dataframe
+    stations_data = [parse_data(read_station(name)) for name in STATION_FILES.values()]    # Import each CSV into dataframe and parse data
+    all_data = pd.concat(stations_data, keys=list(STATION_FILES), names=['station'])       # Concatenates dataframes together into one large dataframe
+    if use_cache:
+        _save_cache(all_data, signature)
     return all_data
 
+_aggregate_cache = {'data': None, 'aggregates': None}               # Aggregates of the last dataframe reported on (see: aggregates)
+
+def _daily_groups(data:pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes the sum, count, median and maximum of every pollutant for every station and day in one grouped pass
+    Days run from 01:00 to 24:00 (see: _station)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+    Returns:
+        daily (DataFrame): indexed by (station, day), with columns (pollutant, statistic)
+    """
+    start = data.index.get_level_values('datetime') - pd.Timedelta(hours=1)
+    grouped = data.groupby([data.index.get_level_values('station'), start.floor('D').rename('day')])
+    return grouped.agg(['sum', 'count', 'median', 'max'])
+
+def _hourly_groups(data:pd.DataFrame) -> pd.DataFrame:
+    """
+    Computes the sum and count of every pollutant for every station and hour of day in one grouped pass
+    Hour 0 is the reading at 01:00 and hour 23 the reading at 24:00 (see: _station)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+    Returns:
+        hourly (DataFrame): indexed by (station, hour), with columns (pollutant, statistic)
+    """
+    start = data.index.get_level_values('datetime') - pd.Timedelta(hours=1)
+    grouped = data.groupby([data.index.get_level_values('station'), start.hour.rename('hour')])
+    return grouped.agg(['sum', 'count'])
+
+def _derive_aggregates(station_aggregates:dict):
+    """
+    Fills in the averages of one station from its sums and counts:
+
+        daily_mean, hourly_mean: sum / count (NaN when a period has no data)
+        monthly_mean: sum / count over the days of each month
+
+    Arguments:
+        station_aggregates (dict): aggregates of one station (see: build_aggregates)
+    """
+    sums, counts = station_aggregates['daily_sum'], station_aggregates['daily_count']
+    station_aggregates['daily_mean'] = sums / counts
+    station_aggregates['monthly_mean'] = sums.resample('M').sum() / counts.resample('M').sum()
+    station_aggregates['hourly_mean'] = station_aggregates['hourly_sum'] / station_aggregates['hourly_count']
+
+def _merge_daily(station_aggregates:dict, daily:pd.DataFrame):
+    """
+    Writes newly computed days into the daily tables of one station, adding any days between the first and last day that have no data
+
+    Arguments:
+        station_aggregates (dict): aggregates of one station (see: build_aggregates)
+        daily (DataFrame): daily statistics of the station, indexed by day, with columns (pollutant, statistic)
+    """
+    for statistic in ('sum', 'count', 'median', 'max'):
+        table = daily.xs(statistic, axis=1, level=1)
+        name = f'daily_{statistic}'
+        if name in station_aggregates:                              # New values replace old ones for the same day
+            old = station_aggregates[name]
+            table = pd.concat([old[~old.index.isin(table.index)], table]).sort_index()
+        days = pd.date_range(table.index.min(), table.index.max(), freq='D', name='day')
+        table = table.reindex(days)
+        station_aggregates[name] = table.fillna(0) if statistic in ('sum', 'count') else table
+
+def build_aggregates(data:pd.DataFrame, alpha:float=None) -> dict:
+    """
+    Computes every report for every station and pollutant in two grouped passes (see: _daily_groups, _hourly_groups)
+    Each report is stored as a dataframe (periods x pollutants), so a report is a dictionary lookup:
+
+        aggregates[station]['daily_mean' | 'daily_median' | 'daily_max' | 'monthly_mean' | 'hourly_mean'][pollutant]
+
+    Sums and counts ('daily_sum', 'daily_count', 'hourly_sum', 'hourly_count') are kept so that rows can be added later (see: append_rows)
+    With alpha, daily quantile sketches are kept too ('daily_sketch' -> pollutant -> table, see: _sketch_tables)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        alpha (float): relative accuracy of the daily quantile sketches, default = None (no sketches)
+    Returns:
+        aggregates (dict): station -> report name -> dataframe
+    """
+    daily = _daily_groups(data)
+    hourly = _hourly_groups(data)
+    result = {}
+    for station in daily.index.get_level_values('station').unique():
+        station_aggregates = {
+            'hourly_sum': hourly.loc[station].xs('sum', axis=1, level=1),
+            'hourly_count': hourly.loc[station].xs('count', axis=1, level=1),
+        }
+        _merge_daily(station_aggregates, daily.loc[station])
+        _derive_aggregates(station_aggregates)
+        result[station] = station_aggregates
+    if alpha is not None:
+        _add_sketches(result, data, alpha)
+    return result
+
+def aggregates(data:pd.DataFrame, alpha:float=None) -> dict:
+    """
+    Returns the aggregates of a dataframe, building them only the first time the dataframe is reported on (see: build_aggregates)
+    Only the aggregates of the most recent dataframe are kept. With alpha, daily quantile sketches of that accuracy are
+    added the first time they are asked for
+
+    Arguments:
+        data (DataFrame | dict): time-indexed pollutant data, or aggregates (returned as-is)
+        alpha (float): relative accuracy of the daily quantile sketches needed, default = None
+    Returns:
+        aggregates (dict): station -> report name -> dataframe
+    Raises:
+        ValueError: if aggregates are given without daily sketches of accuracy alpha
+    """
+    if isinstance(data, dict):                                      # Already aggregates (e.g. from stream_aggregates)
+        if alpha is not None and any(station_aggregates.get('sketch_alpha') != alpha for station_aggregates in data.values()):
+            raise ValueError(f'aggregates have no daily sketches with alpha={alpha} (see: stream_aggregates, build_aggregates)')
+        return data
+    if _aggregate_cache['data'] is not data:
+        _aggregate_cache['aggregates'] = build_aggregates(data)
+        _aggregate_cache['data'] = data
+    result = _aggregate_cache['aggregates']
+    if alpha is not None and any(station_aggregates.get('sketch_alpha') != alpha for station_aggregates in result.values()):
+        _add_sketches(result, data, alpha)
+    return result
+
+def clear_aggregates():
+    """
+    Discards the cached aggregates; used when a dataframe is changed in place
+    """
+    _aggregate_cache['data'] = None
+    _aggregate_cache['aggregates'] = None
+
+def _splice_daily(station_aggregates:dict, days:pd.DatetimeIndex, values:dict):
+    """
+    Writes recomputed days into the daily tables of one station in place (extending the tables when the days lie outside them),
+    then updates the daily means of those days and the monthly means of their months
+
+    Arguments:
+        station_aggregates (dict): aggregates of one station (see: build_aggregates)
+        days (DatetimeIndex): recomputed days
+        values (dict): 'sum' | 'count' | 'median' | 'max' -> array (days x pollutants, in the column order of the tables)
+    """
+    current = station_aggregates['daily_sum'].index
+    first, last = min(current[0], days.min()), max(current[-1], days.max())
+    if first < current[0] or last > current[-1]:
+        full = pd.date_range(first, last, freq='D', name='day')
+        offset = (current[0] - first) // pd.Timedelta(days=1)
+        for statistic in ('sum', 'count', 'median', 'max', 'mean'):
+            name = f'daily_{statistic}'
+            table = station_aggregates[name]
+            extended = np.full((len(full), table.shape[1]), 0.0 if statistic in ('sum', 'count') else np.nan)
+            extended[offset:offset + len(table)] = table.to_numpy()
+            station_aggregates[name] = pd.DataFrame(extended, index=full, columns=table.columns)
+    positions = (days.asi8 - first.value) // pd.Timedelta(days=1).value
+    for statistic in ('sum', 'count', 'median', 'max'):
+        station_aggregates[f'daily_{statistic}'].iloc[positions] = values[statistic]
+    with np.errstate(divide='ignore', invalid='ignore'):            # Days without readings are NaN
+        station_aggregates['daily_mean'].iloc[positions] = values['sum'] / values['count']
+
+    table_days = station_aggregates['daily_sum'].index              # Monthly means of the touched months, from the daily tables
+    month = table_days.year.to_numpy() * 12 + table_days.month.to_numpy() - 1
+    touched = month[positions]
+    lo, hi = np.searchsorted(month, touched.min(), side='left'), np.searchsorted(month, touched.max(), side='right')
+    starts = np.flatnonzero(np.r_[True, month[lo+1:hi] != month[lo:hi-1]])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = (np.add.reduceat(station_aggregates['daily_sum'].to_numpy()[lo:hi], starts, axis=0) /
+                 np.add.reduceat(station_aggregates['daily_count'].to_numpy()[lo:hi], starts, axis=0))
+    table = station_aggregates['monthly_mean']
+    months = month[-1] - month[0] + 1
+    if len(table) != months or table.index[0].month != month[0] % 12 + 1:
+        table = station_aggregates['monthly_mean'] = table.reindex(pd.date_range(table_days[0], periods=months, freq='M', name=table.index.name))
+    table.iloc[month[lo:hi][starts] - month[0]] = means
+
+def _station_rows(data:pd.DataFrame, monitoring_station:str) -> tuple:
+    """
+    Finds the rows of one station without scanning the other stations when data is sorted by (station, datetime)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        monitoring_station (str): selected monitoring station
+    Returns:
+        rows (ndarray): positions of the station's rows (empty if the station has no rows)
+        times (DatetimeIndex): datetimes of the station's rows
+    """
+    try:
+        rows = data.index.get_loc(monitoring_station)
+    except KeyError:
+        return np.array([], dtype=np.int64), pd.DatetimeIndex([])
+    if isinstance(rows, slice):
+        rows = np.arange(rows.start, rows.stop)
+    elif rows.dtype == bool:                                        # Unsorted data gives a mask
+        rows = np.flatnonzero(rows)
+    return rows, data.index.levels[1].take(data.index.codes[1][rows])
+
+def _insert_rows(data:pd.DataFrame, new_rows:pd.DataFrame) -> pd.DataFrame:
+    """
+    Inserts new rows into data sorted by (station, datetime) at their positions, instead of sorting the combined rows again:
+
+        1: Merges the stations and datetimes of the new rows into the (sorted) index levels and recodes the old rows
+        2: Finds the position of every new row by binary search on a single integer key per row (station code, datetime code)
+        3: Inserts the new values and codes at those positions, column by column
+
+    Falls back to sorting when data is unsorted.
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        new_rows (DataFrame): rows to add, indexed by (station, datetime)
+    Returns:
+        combined (DataFrame): data with new rows added, sorted
+    """
+    index = data.index
+    if not index.is_monotonic_increasing or not all(level.is_monotonic_increasing for level in index.levels):
+        return pd.concat([data, new_rows]).sort_index()
+    levels, old_codes, new_codes = [], [], []
+    for level, codes, values in zip(index.levels, index.codes, (new_rows.index.get_level_values(i) for i in range(2))):   #1
+        merged = level.union(values.unique())
+        levels.append(merged)
+        old_codes.append(merged.get_indexer(level)[codes])
+        new_codes.append(merged.get_indexer(values))
+    width = len(levels[1])
+    positions = np.searchsorted(old_codes[0] * width + old_codes[1], new_codes[0] * width + new_codes[1], side='right')   #2
+    combined_index = pd.MultiIndex(levels=levels, codes=[np.insert(old, positions, new) for old, new in zip(old_codes, new_codes)],   #3
+                                   names=index.names, verify_integrity=False)
+    columns = {column: np.insert(data[column].to_numpy(), positions, new_rows[column].to_numpy()) for column in data.columns}
+    return pd.DataFrame(columns, index=combined_index)
+
+def append_rows(data:pd.DataFrame, new_rows:pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds new rows to the pollutant data. If data has cached aggregates, they are updated rather than rebuilt:
+
+        - Days (of each station) with new rows are recomputed from their rows only, found by binary search,
+          and written into the daily tables (see: _splice_daily)
+        - Daily and monthly means are recomputed for those days and months only
+        - Hour-of-day sums and counts are increased by the new rows
+        - Daily quantile sketches, if any, are rebuilt for those days only (see: _splice_sketches)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        new_rows (DataFrame): rows to add, indexed by (station, datetime)
+    Returns:
+        combined (DataFrame): data with new rows added
+    """
+    new_rows = new_rows.sort_index()
+    combined = _insert_rows(data, new_rows)
+    if _aggregate_cache['data'] is not data or len(new_rows) == 0:
+        return combined
+
+    result = _aggregate_cache['aggregates']
+    new_hourly = _hourly_groups(new_rows)
+    stations = new_rows.index.get_level_values('station')
+    start = new_rows.index.get_level_values('datetime') - pd.Timedelta(hours=1)
+    touched = [new_rows]
+    for station in stations.unique():                               # Existing rows of the days that get new rows
+        days = start[stations == station].floor('D').unique()
+        rows, times = _station_rows(data, station)
+        if not times.is_monotonic_increasing:
+            touched.append(data.iloc[rows[(times - pd.Timedelta(hours=1)).floor('D').isin(days)]])
+        elif len(rows):
+            first = times.searchsorted(days + pd.Timedelta(hours=1), side='left')
+            last = times.searchsorted(days + pd.Timedelta(days=1), side='right')
+            touched.append(data.iloc[rows[np.concatenate([np.arange(i, j) for i, j in zip(first, last)])]])
+    touched = pd.concat(touched)
+    daily = _daily_groups(touched)
+    alpha = next((station_aggregates['sketch_alpha'] for station_aggregates in result.values() if 'sketch_alpha' in station_aggregates), None)
+    sketches = _sketch_tables(touched, alpha) if alpha is not None else {}
+
+    new_hourly = new_hourly.swaplevel(axis=1)                       # Columns (statistic, pollutant)
+    daily_values = daily.to_numpy()
+    for station in stations.unique():
+        station_aggregates = result.setdefault(station, {})
+        hourly_sum, hourly_count = new_hourly['sum'].loc[station], new_hourly['count'].loc[station]
+        if 'hourly_sum' in station_aggregates:
+            hourly_sum = hourly_sum.add(station_aggregates['hourly_sum'], fill_value=0)
+            hourly_count = hourly_count.add(station_aggregates['hourly_count'], fill_value=0)
+        station_aggregates['hourly_sum'], station_aggregates['hourly_count'] = hourly_sum, hourly_count
+        if alpha is not None:                                       # Sketches of the touched days replace the old ones
+            _splice_sketches(station_aggregates, sketches[station], alpha)
+        if 'daily_sum' in station_aggregates:
+            rows = daily.index.get_loc(station)
+            columns = station_aggregates['daily_sum'].columns
+            values = {statistic: daily_values[rows][:, [daily.columns.get_loc((pollutant, statistic)) for pollutant in columns]]
+                      for statistic in ('sum', 'count', 'median', 'max')}
+            _splice_daily(station_aggregates, daily.index.levels[1].take(daily.index.codes[1][rows]), values)
+            station_aggregates['hourly_mean'] = hourly_sum / hourly_count
+        else:                                                       # New station
+            _merge_daily(station_aggregates, daily.loc[station])
+            _derive_aggregates(station_aggregates)
+
+    _aggregate_cache['data'] = combined
+    return combined
+
+def _station_name(filename:str) -> str:
+    """
+    Finds the station name of a station CSV from its file name: 'Pollution-London Harlington.csv' -> 'Harlington'
+
+    Arguments:
+        filename (str): path to station CSV
+    Returns:
+        station (str): station name
+    """
+    name = os.path.splitext(os.path.basename(filename))[0]
+    name = name[len('Pollution-'):] if name.startswith('Pollution-') else name
+    return name[len('London '):] if name.startswith('London ') else name
+
+def stream_aggregates(pattern:str='data/Pollution-*.csv', chunksize:int=50000, alpha:float=None) -> dict:
+    """
+    Builds the aggregates of every station CSV matching a pattern (see: build_aggregates) by reading each file in chunks,
+    so the full hourly data is never held in memory. For each chunk:
+
+        - Hour-of-day sums and counts are added to running totals
+        - Complete days are reduced to their sum, count, median and maximum; the readings of the last (possibly incomplete)
+          day are carried into the next chunk, so daily medians are exact
+        - With alpha, readings are also counted in daily quantile sketches (see: _sketch_tables); a day split across
+          chunks is merged, so the sketches are the same as those of build_aggregates
+
+    Rows of each file must be in time order (as in the station CSVs). Memory use depends on the chunk size, not the file size
+
+    Arguments:
+        pattern (str): glob pattern of station CSVs, default = data/Pollution-*.csv
+        chunksize (int): number of rows read at a time, default = 50000
+        alpha (float): relative accuracy of the quantile sketches, default = None (no sketches)
+    Returns:
+        aggregates (dict): station -> report name -> dataframe (see: build_aggregates), with alpha also 'daily_sketch'
+    """
+    result = {}
+    for filename in sorted(glob.glob(pattern)):
+        station = _station_name(filename)
+        daily_tables, hourly_sum, hourly_count = [], 0, 0
+        sketches = []
+        carry = None
+        for chunk in pd.read_csv(filename, na_values=['No data'], dtype=STATION_DTYPES, chunksize=chunksize):
+            chunk = parse_data(chunk)
+            if carry is not None:
+                chunk = pd.concat([carry, chunk])
+            chunk = pd.concat({station: chunk}, names=['station'])
+            new = chunk if carry is None else chunk.iloc[len(carry):]
+            if alpha is not None:
+                sketches.append(_sketch_tables(new, alpha)[station])
+            hourly = _hourly_groups(new).loc[station]
+            hourly = hourly.reindex(range(24), fill_value=0)            # A chunk may not cover every hour of day
+            hourly_sum = hourly.xs('sum', axis=1, level=1) + hourly_sum
+            hourly_count = hourly.xs('count', axis=1, level=1) + hourly_count
+
+            days = (chunk.index.get_level_values('datetime') - pd.Timedelta(hours=1)).floor('D')
+            complete = days < days.max()
+            if complete.any():
+                daily_tables.append(_daily_groups(chunk[complete]).loc[station])
+            carry = chunk[~complete].loc[station]
+        if carry is not None and len(carry):
+            daily_tables.append(_daily_groups(pd.concat({station: carry}, names=['station'])).loc[station])
+        if not daily_tables:
+            continue
+
+        station_aggregates = result.setdefault(station, {})
+        if 'hourly_sum' in station_aggregates:
+            hourly_sum = hourly_sum.add(station_aggregates['hourly_sum'], fill_value=0)
+            hourly_count = hourly_count.add(station_aggregates['hourly_count'], fill_value=0)
+        station_aggregates['hourly_sum'], station_aggregates['hourly_count'] = hourly_sum, hourly_count
+        if alpha is not None:
+            previous = [station_aggregates['daily_sketch']] if 'daily_sketch' in station_aggregates else []
+            station_aggregates['daily_sketch'] = {pollutant: _merge_sketch_tables([tables[pollutant] for tables in previous + sketches])
+                                                  for pollutant in POLLUTANTS}
+            station_aggregates['sketch_alpha'] = alpha
+        _merge_daily(station_aggregates, pd.concat(daily_tables))
+        _derive_aggregates(station_aggregates)
+    return result
+
+SKETCH_MIN_VALUE = 1e-9                                              # Magnitudes below this are counted as 0
+
+def _sketch_gamma(alpha:float) -> float:
+    """
+    Returns the bucket growth factor of a quantile sketch with relative accuracy alpha: (1 + alpha) / (1 - alpha)
+
+    Arguments:
+        alpha (float): relative accuracy, 0 < alpha < 1
+    Returns:
+        gamma (float): ratio between the bounds of consecutive buckets
+    """
+    if not 0 < alpha < 1:
+        raise ValueError('alpha must be between 0 and 1')
+    return (1 + alpha) / (1 - alpha)
+
+def _sketch_keys(values:np.ndarray, gamma:float) -> np.ndarray:
+    """
+    Maps values to signed, ordered bucket keys: bucket k (k >= 1) holds magnitudes in (gamma^(k-2), gamma^(k-1)] x SKETCH_MIN_VALUE,
+    negative values get key -k and magnitudes below SKETCH_MIN_VALUE key 0, so keys sort in the same order as values
+
+    Arguments:
+        values (ndarray): values without NaN
+        gamma (float): bucket growth factor (see: _sketch_gamma)
+    Returns:
+        keys (ndarray): int64 bucket key of every value
+    """
+    magnitude = np.abs(values) / SKETCH_MIN_VALUE
+    keys = np.zeros(len(values), dtype=np.int64)
+    large = magnitude >= 1
+    keys[large] = np.ceil(np.log(magnitude[large]) / np.log(gamma)).astype(np.int64) + 1
+    return np.where(values < 0, -keys, keys)
+
+def _sketch_values(keys:np.ndarray, gamma:float) -> np.ndarray:
+    """
+    Returns the representative value of bucket keys, within a relative error of alpha of every value in the bucket
+
+    Arguments:
+        keys (ndarray): bucket keys (see: _sketch_keys)
+        gamma (float): bucket growth factor (see: _sketch_gamma)
+    Returns:
+        values (ndarray): float64 value of every key
+    """
+    magnitude = 2 * gamma ** (np.abs(keys) - 1) / (gamma + 1) * SKETCH_MIN_VALUE
+    return np.where(keys == 0, 0.0, np.sign(keys) * magnitude)
+
+def sketch_new(alpha:float=0.01) -> dict:
+    """
+    Creates an empty quantile sketch (DDSketch): values are counted in logarithmic buckets, so any quantile is returned
+    within a relative error of alpha using memory that grows with the range of values, not their number
+
+    Arguments:
+        alpha (float): relative accuracy, default = 0.01
+    Returns:
+        sketch (dict): {'alpha': float, 'count': int, 'buckets': {key: count}}
+    """
+    _sketch_gamma(alpha)
+    return {'alpha': alpha, 'count': 0, 'buckets': {}}
+
+def sketch_add(sketch:dict, values) -> dict:
+    """
+    Adds values to a quantile sketch in place, ignoring NaN
+
+    Arguments:
+        sketch (dict): quantile sketch (see: sketch_new)
+        values (array-like): values to add
+    Returns:
+        sketch (dict): the updated sketch
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    keys, counts = np.unique(_sketch_keys(values, _sketch_gamma(sketch['alpha'])), return_counts=True)
+    buckets = sketch['buckets']
+    for key, count in zip(keys.tolist(), counts.tolist()):
+        buckets[key] = buckets.get(key, 0) + count
+    sketch['count'] += len(values)
+    return sketch
+
+def sketch_merge(*sketches:dict) -> dict:
+    """
+    Merges quantile sketches with the same alpha (e.g. of several stations or periods) into a new sketch
+
+    Arguments:
+        sketches (dict): quantile sketches (see: sketch_new)
+    Returns:
+        sketch (dict): sketch of all values added to any of the sketches
+    """
+    if len({sketch['alpha'] for sketch in sketches}) != 1:
+        raise ValueError('sketches must have the same alpha')
+    merged = sketch_new(sketches[0]['alpha'])
+    for sketch in sketches:
+        for key, count in sketch['buckets'].items():
+            merged['buckets'][key] = merged['buckets'].get(key, 0) + count
+        merged['count'] += sketch['count']
+    return merged
+
+def sketch_quantile(sketch:dict, quantile:float) -> float:
+    """
+    Returns a quantile of the values added to a sketch, interpolated between the values of rank quantile x (count - 1)
+    either side in sorted order (as pandas), each within a relative error of alpha
+
+    Arguments:
+        sketch (dict): quantile sketch (see: sketch_new)
+        quantile (float): quantile between 0 and 1 (e.g. 0.5 for the median)
+    Returns:
+        value (float): approximate quantile, NaN when the sketch is empty
+    """
+    if sketch['count'] == 0:
+        return np.nan
+    keys = np.array(sorted(sketch['buckets']), dtype=np.int64)
+    totals = np.cumsum([sketch['buckets'][key] for key in keys.tolist()])
+    rank = quantile * (sketch['count'] - 1)
+    position = np.searchsorted(totals, [np.floor(rank), np.ceil(rank)], side='right')
+    lower, upper = _sketch_values(keys[position], _sketch_gamma(sketch['alpha']))
+    return float(lower + (upper - lower) * (rank - np.floor(rank)))
+
+DAY = pd.Timedelta(days=1).value                                     # Nanoseconds in a day
+HOUR = pd.Timedelta(hours=1).value
+
+def _sketch_tables(data:pd.DataFrame, alpha:float, pollutants:list=POLLUTANTS) -> dict:
+    """
+    Builds a quantile sketch (see: sketch_new) of every station, pollutant and day, stored as a table of bucket counts:
+    one row per (day, bucket key) with readings, sorted by day then key. Tables of the same station and pollutant are
+    merged by adding counts (see: _merge_sketch_tables), so any period's sketch can be built from its days
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        alpha (float): relative accuracy
+        pollutants (list): selected pollutants, default = POLLUTANTS
+    Returns:
+        tables (dict): station -> pollutant -> DataFrame with day, key and count columns
+    """
+    gamma = _sketch_gamma(alpha)
+    station_codes = data.index.codes[0]
+    days = (data.index.get_level_values('datetime').asi8 - HOUR) // DAY            # Days run from 01:00 to 24:00 (see: _station)
+    used = np.flatnonzero(np.bincount(station_codes, minlength=len(data.index.levels[0])))
+    tables = {data.index.levels[0][code]: {} for code in used}
+    for pollutant in pollutants:
+        values = data[pollutant].to_numpy()
+        present = ~np.isnan(values)
+        station, day, key = station_codes[present], days[present], _sketch_keys(values[present], gamma)
+        order = np.lexsort((key, day, station))
+        station, day, key = station[order], day[order], key[order]
+        starts = np.flatnonzero(np.r_[True, (station[1:] != station[:-1]) | (day[1:] != day[:-1]) | (key[1:] != key[:-1])])
+        counts = np.diff(np.r_[starts, len(station)])
+        station, day, key = station[starts], day[starts], key[starts]
+        for code in used:
+            first, last = np.searchsorted(station, [code, code + 1])
+            tables[data.index.levels[0][code]][pollutant] = pd.DataFrame({
+                'day': (day[first:last] * DAY).astype('datetime64[ns]'), 'key': key[first:last], 'count': counts[first:last]})
+    return tables
+
+def _merge_sketch_tables(tables:list) -> pd.DataFrame:
+    """
+    Merges daily sketch tables (see: _sketch_tables) by adding the counts of equal (day, key) rows
+
+    Arguments:
+        tables (list): daily sketch tables of one station and pollutant
+    Returns:
+        table (DataFrame): merged table, sorted by day then key
+    """
+    table = pd.concat(tables, ignore_index=True)
+    return table.groupby(['day', 'key'], as_index=False, sort=True)['count'].sum()
+
+def _add_sketches(result:dict, data:pd.DataFrame, alpha:float):
+    """
+    Adds the daily sketches of every station in data to its aggregates, replacing sketches of another alpha
+
+    Arguments:
+        result (dict): aggregates (see: build_aggregates)
+        data (DataFrame): time-indexed pollutant data
+        alpha (float): relative accuracy
+    """
+    for station, tables in _sketch_tables(data, alpha).items():
+        result.setdefault(station, {})
+        result[station]['daily_sketch'], result[station]['sketch_alpha'] = tables, alpha
+
+def _splice_sketches(station_aggregates:dict, tables:dict, alpha:float):
+    """
+    Replaces the daily sketches of one station for the days in tables (see: append_rows)
+
+    Arguments:
+        station_aggregates (dict): aggregates of one station (see: build_aggregates)
+        tables (dict): pollutant -> daily sketch table of the recomputed days (see: _sketch_tables)
+        alpha (float): relative accuracy of the tables
+    """
+    if 'daily_sketch' not in station_aggregates:                    # New station
+        station_aggregates['daily_sketch'], station_aggregates['sketch_alpha'] = tables, alpha
+        return
+    for pollutant, table in tables.items():
+        old = station_aggregates['daily_sketch'][pollutant]
+        old = old[~old['day'].isin(table['day'])]
+        station_aggregates['daily_sketch'][pollutant] = pd.concat([old, table], ignore_index=True).sort_values(['day', 'key'], ignore_index=True)
+
+def _period_quantiles(groups:np.ndarray, keys:np.ndarray, counts:np.ndarray, periods:int, quantiles:tuple, gamma:float) -> np.ndarray:
+    """
+    Finds quantiles of many sketches at once: bucket counts are summed per (period, bucket) pair, sorted by period then bucket,
+    and the bucket holding each quantile's rank is found by one search
+
+    Arguments:
+        groups (ndarray): period of every reading (or bucket count), 0 to periods - 1
+        keys (ndarray): bucket key of every reading (see: _sketch_keys)
+        counts (ndarray): number of readings of every row, or None for one each
+        periods (int): number of periods
+        quantiles (tuple): quantiles between 0 and 1
+        gamma (float): bucket growth factor (see: _sketch_gamma)
+    Returns:
+        table (ndarray): periods x quantiles, NaN for periods without readings
+    """
+    offset = keys.min() if len(keys) else 0
+    span = int(keys.max() - offset + 1) if len(keys) else 1
+    if counts is None:
+        pairs, totals = np.unique(groups * span + (keys - offset), return_counts=True)
+        sizes = np.bincount(groups, minlength=periods)
+    else:
+        pairs, inverse = np.unique(groups * span + (keys - offset), return_inverse=True)
+        totals = np.bincount(inverse, weights=counts).astype(np.int64)
+        sizes = np.bincount(groups, weights=counts, minlength=periods).astype(np.int64)
+    totals = np.cumsum(totals)
+    before = np.cumsum(sizes) - sizes                                    # Readings in earlier periods
+
+    table = np.full((periods, len(quantiles)), np.nan)
+    filled = sizes > 0
+    for column, quantile in enumerate(quantiles):
+        rank = quantile * (sizes[filled] - 1)
+        lower, upper = (_sketch_values(pairs[np.searchsorted(totals, before[filled] + bound, side='right')] % span + offset, gamma)
+                        for bound in (np.floor(rank), np.ceil(rank)))
+        table[filled, column] = lower + (upper - lower) * (rank - np.floor(rank))    # Interpolated as pandas quantile
+    return table
+
+def _series(data:pd.DataFrame, monitoring_stations, pollutant:str, start=None, end=None) -> pd.Series:
+    """
+    Selects one pollutant of one or more stations within an optional time window (see: _station)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        monitoring_stations (str | list): selected monitoring station(s)
+        pollutant (str): selected pollutant
+        start, end (str | Timestamp): first and last hour of the window (inclusive), default = whole record
+    Returns:
+        series (Series): time-indexed pollutant readings, of all selected stations
+    """
+    if isinstance(monitoring_stations, str):
+        monitoring_stations = [monitoring_stations]
+    series = pd.concat([_station(data, station)[pollutant] for station in monitoring_stations])
+    return series.loc[start:end] if start is not None or end is not None else series
+
+def station_sketch(data:pd.DataFrame, monitoring_stations, pollutant:str, start=None, end=None, alpha:float=0.01) -> dict:
+    """
+    Builds a quantile sketch of a pollutant over any time window, for one or more stations (see: sketch_new)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        monitoring_stations (str | list): selected monitoring station(s)
+        pollutant (str): selected pollutant
+        start, end (str | Timestamp): first and last hour of the window (inclusive), default = whole record
+        alpha (float): relative accuracy, default = 0.01
+    Returns:
+        sketch (dict): quantile sketch of the readings in the window
+    """
+    return sketch_add(sketch_new(alpha), _series(data, monitoring_stations, pollutant, start, end).to_numpy())
+
+def _whole_days(freq:str) -> bool:
+    """
+    Checks whether every period of a pandas frequency is made of whole days (e.g. 'D', '2D', 'W', 'M'; not '6H')
+    """
+    offset = pd.tseries.frequencies.to_offset(freq)
+    return not isinstance(offset, pd.tseries.offsets.Tick) or offset.nanos % DAY == 0
+
+def approximate_quantiles(data:pd.DataFrame, monitoring_stations, pollutant:str, quantiles:tuple=(0.5, 0.9, 0.99),
+                          freq:str='D', start=None, end=None, alpha:float=0.01) -> pd.DataFrame:
+    """
+    Returns approximate quantiles of a pollutant for every period (day, month, ...) of a time window, within a relative
+    error of alpha (see: sketch_quantile, _period_quantiles)
+
+    Periods of whole days are answered from the daily sketches of the aggregates (see: aggregates), which are built once
+    per dataframe and alpha, kept up to date by append_rows and can be streamed from the CSVs (see: stream_aggregates).
+    With aggregates, start and end select whole days. Shorter periods, or windows of a dataframe, are sketched from the readings
+
+    Arguments:
+        data (DataFrame | dict): time-indexed pollutant data, or aggregates with daily sketches of accuracy alpha
+        monitoring_stations (str | list): selected monitoring station(s), whose readings are pooled
+        pollutant (str): selected pollutant
+        quantiles (tuple): quantiles between 0 and 1, default = (0.5, 0.9, 0.99)
+        freq (str): pandas period frequency (e.g. 'D', 'M', 'W', '6H'), or None for one value over the whole window
+        start, end (str | Timestamp): first and last hour (or day, with aggregates) of the window (inclusive), default = whole record
+        alpha (float): relative accuracy, default = 0.01
+    Returns:
+        quantile_table (DataFrame): indexed by period, with a column per quantile named p50, p90, ...
+    Raises:
+        ValueError: if aggregates have no daily sketches of accuracy alpha, or freq is shorter than a day
+    """
+    gamma = _sketch_gamma(alpha)
+    stations = [monitoring_stations] if isinstance(monitoring_stations, str) else list(monitoring_stations)
+    columns = [f'p{quantile * 100:g}' for quantile in quantiles]
+    daily = freq is None or _whole_days(freq)
+    if isinstance(data, dict) or (daily and start is None and end is None):
+        if not daily:
+            raise ValueError('quantiles of aggregates need periods of whole days')
+        sketches = aggregates(data, alpha)
+        table = pd.concat([sketches[station]['daily_sketch'][pollutant] for station in stations], ignore_index=True)
+        record = pd.DatetimeIndex(np.concatenate([sketches[station]['daily_count'].index.to_numpy() for station in stations]))
+        days = pd.DatetimeIndex(table['day'])
+        window, record_window = np.ones(len(days), dtype=bool), np.ones(len(record), dtype=bool)
+        if start is not None:
+            window &= days >= pd.Timestamp(start).floor('D')
+            record_window &= record >= pd.Timestamp(start).floor('D')
+        if end is not None:
+            window &= days <= pd.Timestamp(end).floor('D')
+            record_window &= record <= pd.Timestamp(end).floor('D')
+        record, times = record[record_window], days[window]                  # Days with or without readings, days with readings
+        keys, counts = table['key'].to_numpy()[window], table['count'].to_numpy()[window]
+    else:
+        series = _series(data, stations, pollutant, start, end)
+        values = series.to_numpy()
+        present = ~np.isnan(values)
+        record, times, keys, counts = series.index, series.index[present], _sketch_keys(values[present], gamma), None
+    if freq is None:
+        periods = pd.Index(['all'], name='period')
+        groups = np.zeros(len(times), dtype=np.int64)
+    else:
+        labels = record.to_period(freq)
+        periods = pd.period_range(labels.min(), labels.max(), freq=freq, name='period')
+        groups = times.to_period(freq).asi8 - periods[0].ordinal
+    return pd.DataFrame(_period_quantiles(groups, keys, counts, len(periods), quantiles, gamma), index=periods, columns=columns)
+
 def daily_average(data:pd.DataFrame, monitoring_station:str, pollutant:str) -> np.ndarray:
     """
-    Resamples the input dataframe for a selected monitoring station and pollutant and returns a list of the daily averages
+    Returns a list of the daily averages for a selected monitoring station and pollutant (see: aggregates)
     
     Arguments:
-        data (DataFrame): time-indexed pollutant data
+        data (DataFrame | dict): time-indexed pollutant data, or aggregates (see: build_aggregates, stream_aggregates)
         monitoring_station (str): selected monitoring station
         pollutant (str): selected pollutant
     Returns:
         d_averages_array (ndarray): list of all daily averages for specified station and pollutant
     """
-    query = data.loc[monitoring_station]                    # Filters values for chosen monitoring station
-    d_averages = query.resample('D').mean()                 # Resamples hourly data into daily average
-    d_averages_array = d_averages[pollutant].to_numpy()     # Exports pollutant data into array
+    d_averages = aggregates(data)[monitoring_station]['daily_mean']        # Daily averages of chosen monitoring station
+    d_averages_array = d_averages[pollutant].to_numpy(copy=True)            # Exports pollutant data into array
     return d_averages_array 
 
-def daily_median(data:pd.DataFrame, monitoring_station:str, pollutant:str) -> np.ndarray:
+def daily_median(data:pd.DataFrame, monitoring_station:str, pollutant:str, alpha:float=None) -> np.ndarray:
     """
-    Resamples the input dataframe for a selected monitoring station and pollutant and returns a list of the daily medians
+    Returns a list of the daily medians for a selected monitoring station and pollutant (see: aggregates)
+    With alpha, medians are approximated from the daily quantile sketches of the aggregates instead (see: approximate_quantiles)
     
     Arguments:
-        data (DataFrame): time-indexed pollutant data
+        data (DataFrame | dict): time-indexed pollutant data, or aggregates (see: build_aggregates, stream_aggregates)
         monitoring_station (str): selected monitoring station
         pollutant (str): selected pollutant
+        alpha (float): relative accuracy of approximate medians, default = None (exact medians)
     Returns:
         d_medians_array (ndarray): list of all daily medians for specified station and pollutant
     """
-    query = data.loc[monitoring_station]
-    d_medians = query.resample('D').median()                # Resamples hourly data into daily median
-    d_medians_array = d_medians[pollutant].to_numpy()
+    d_medians = aggregates(data)[monitoring_station]['daily_median']
+    if alpha is not None:                                           # Same days as the exact medians
+        medians = approximate_quantiles(data, monitoring_station, pollutant, (0.5,), 'D', alpha=alpha)['p50']
+        return medians.reindex(d_medians.index.to_period('D')).to_numpy()
+    d_medians_array = d_medians[pollutant].to_numpy(copy=True)
     return d_medians_array
 
 def hourly_average(data:pd.DataFrame, monitoring_station:str, pollutant:str) -> np.ndarray:
     """
-    Groups the input dataframe by hour of day for selected monitoring station and pollutant and returns a list of hourly averages
+    Returns a list of hourly averages (by hour of day) for a selected monitoring station and pollutant (see: aggregates)
     
     Arguments:
-        data (DataFrame): time-indexed pollutant data
+        data (DataFrame | dict): time-indexed pollutant data, or aggregates (see: build_aggregates, stream_aggregates)
         monitoring_station (str): selected monitoring station
         pollutant (str): selected pollutant
     Returns:
-        h_averages_array (ndarray): list of hourly averages for specified station and pollutant
+        h_averages_array (ndarray): list of hourly averages for specified station and pollutant (01:00 to 24:00)
     """
-    query = data.loc[monitoring_station]                        
-    h_averages = query.groupby([query.index.hour]).mean()       # Groups all values by hour of day (0-23H)
-    h_averages_array = h_averages[pollutant].to_numpy()         
-    h_averages_array = np.roll(h_averages_array, -1)            # Moves first element in array to last (0H = 24H) to correspond with last hour of the day
+    h_averages = aggregates(data)[monitoring_station]['hourly_mean']
+    h_averages_array = h_averages[pollutant].to_numpy(copy=True)
     return h_averages_array
 
 def monthly_average(data:pd.DataFrame, monitoring_station:str, pollutant:str) -> np.ndarray:
     """
-    Resamples the input dataframe for a selected monitoring station and pollutant and returns a list of the monthly averages
+    Returns a list of the monthly averages for a selected monitoring station and pollutant (see: aggregates)
     
     Arguments:
-        data (DataFrame): time-indexed pollutant data
+        data (DataFrame | dict): time-indexed pollutant data, or aggregates (see: build_aggregates, stream_aggregates)
         monitoring_station (str): selected monitoring station
         pollutant (str): selected pollutant
     Returns:
         m_averages_array (ndarray): list of all monthly averages for specified station and pollutant
     """
-    query = data.loc[monitoring_station]
-    m_averages = query.resample('M').mean()                   # Resamples hourly data into monthly average
-    m_averages_array = m_averages[pollutant].to_numpy()
+    m_averages = aggregates(data)[monitoring_station]['monthly_mean']
+    m_averages_array = m_averages[pollutant].to_numpy(copy=True)
     return m_averages_array
 
+def peak_hours(data:pd.DataFrame, dates=None, monitoring_stations=None, pollutants:list=POLLUTANTS) -> pd.DataFrame:
+    """
+    Finds the highest pollution level of every day and the time of its reading, for many stations and pollutants in one
+    grouped pass. Readings are sorted by (station, day, level), so the first of each group is the peak; NaN readings sort
+    last and ties go to the earliest reading. Missing hours are skipped, and days without data have a NaN peak and NaT time
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        dates (list): selected dates (e.g. ['2021-01-01']), default = None (every day with readings)
+        monitoring_stations (list): selected monitoring stations, default = None (all stations)
+        pollutants (list): selected pollutants, default = POLLUTANTS
+    Returns:
+        peaks (DataFrame): indexed by (station, day), with columns (pollutant, 'value' | 'time'), where time is the
+                           timestamp of the reading (01:00 to 24:00 of the day)
+    """
+    stations = data.index.get_level_values('station')
+    times = data.index.get_level_values('datetime')
+    days = (times - pd.Timedelta(hours=1)).floor('D')                  # Readings are hour-ending (see: _station)
+    keep = np.ones(len(data), dtype=bool)
+    if monitoring_stations is not None:
+        keep &= stations.isin(monitoring_stations)
+    if dates is not None:
+        dates = pd.DatetimeIndex(pd.to_datetime(list(dates))).floor('D')
+        keep &= days.isin(dates)
+    stations, times, days = stations[keep], times[keep], days[keep]
+
+    if dates is None:
+        groups = pd.MultiIndex.from_arrays([stations, days], names=['station', 'day']).unique().sort_values()
+    else:
+        selected = stations.unique() if monitoring_stations is None else pd.Index(monitoring_stations)
+        groups = pd.MultiIndex.from_product([selected, dates.unique().sort_values()], names=['station', 'day'])
+    codes = groups.get_indexer(pd.MultiIndex.from_arrays([stations, days]))
+
+    peaks = {}
+    for pollutant in pollutants:
+        values = data[pollutant].to_numpy()[keep]
+        levels = np.where(np.isnan(values), np.inf, -values)            # Descending level, NaN last
+        order = np.lexsort((levels, codes))                            # Stable, so ties keep the earliest reading
+        first_codes, first = np.unique(codes[order], return_index=True)
+        rows = order[first]
+        peak_values = np.full(len(groups), np.nan)
+        peak_times = np.full(len(groups), np.datetime64('NaT'), dtype='datetime64[ns]')
+        peak_values[first_codes] = values[rows]
+        peak_times[first_codes] = np.where(np.isnan(values[rows]), np.datetime64('NaT'), times[rows].to_numpy())
+        peaks[(pollutant, 'value')] = peak_values
+        peaks[(pollutant, 'time')] = peak_times
+    return pd.DataFrame(peaks, index=groups)
+
 def peak_hour_date(data:pd.DataFrame, date:str, monitoring_station:str, pollutant:str)-> tuple:
     """
-    Finds the highest pollution level for a selected date, monitoring station and pollutant and returns a tuple with pollution value and corresponding hour of day
+    Finds the highest pollution level for a selected date, monitoring station and pollutant and returns a tuple with pollution value and corresponding hour of day (see: peak_hours)
     
     Arguments:
         data (DataFrame): time-indexed pollutant data
@@ -128,15 +963,118 @@ def peak_hour_date(data:pd.DataFrame, date:str, monitoring_station:str, pollutan
         monitoring_station (str): selected monitoring station
         pollutant (str): selected pollutant
     Returns:
-        peak_hour_tuple (tuple): pollutant level and corresponding time of day
+        peak_hour_tuple (tuple): pollutant level and corresponding time of day (None when the day has no data)
     """
-    station_query = data.loc[monitoring_station]            
-    date_query = station_query.loc[date]                                    # Filters values for chosen date
-    peak_hour = date_query[pollutant].max()
-    peak_hour_index = str(date_query[pollutant].argmax()+1).zfill(2)        # Finds index of highest value (0-23), adds 1 to give hour of day (1-24) and pads string (01-24)
-    peak_hour_tuple = (peak_hour_index +':00',peak_hour)                    # Concatenates padded string (hour of day) and minutes (':00')
+    peak = peak_hours(data, [date], [monitoring_station], [pollutant]).iloc[0]
+    peak_hour, peak_time = peak[(pollutant, 'value')], peak[(pollutant, 'time')]
+    if pd.isna(peak_time):
+        return (None, peak_hour)
+    hour = (peak_time - pd.Timestamp(date).floor('D')) // pd.Timedelta(hours=1)    # Hour of day (1-24)
+    peak_hour_tuple = (str(hour).zfill(2) +':00',peak_hour)                 # Concatenates padded string (hour of day) and minutes (':00')
     return peak_hour_tuple
 
+LIMIT_VALUES = {                                                    # pollutant -> (averaging period, limit in ug/m3)
+    'pm10': ('D', 50.0),                                            # Daily mean (UK / EU limit value)
+    'pm25': ('D', 15.0),                                            # Daily mean (WHO 2021 guideline)
+}
+
+def _hourly_grid(data:pd.DataFrame, pollutants:list) -> tuple:
+    """
+    Places the readings of every station on a complete hourly grid from its first to its last reading, so missing hours
+    are NaN rows and windows can be taken by position. Stations are stored one after another
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        pollutants (list): selected pollutants
+    Returns:
+        index (MultiIndex): (station, datetime) of every grid row
+        values (ndarray): grid readings (rows x pollutants)
+        starts (ndarray): first grid row of the station of every row
+    """
+    stations = data.index.levels[data.index.names.index('station')]
+    codes = data.index.codes[data.index.names.index('station')]
+    hours = data.index.get_level_values('datetime').to_numpy().astype('datetime64[h]').astype(np.int64)
+    first = np.full(len(stations), np.iinfo(np.int64).max)
+    last = np.full(len(stations), np.iinfo(np.int64).min)
+    np.minimum.at(first, codes, hours)
+    np.maximum.at(last, codes, hours)
+    used = np.bincount(codes, minlength=len(stations)) > 0
+    first, last = np.where(used, first, 0), np.where(used, last, -1)   # Unused stations get no rows
+    lengths = last - first + 1
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+    rows = np.repeat(np.arange(len(stations)), lengths)
+    grid_hours = first[rows] + np.arange(lengths.sum()) - offsets[rows]
+    values = np.full((len(rows), len(pollutants)), np.nan, order='F')     # Column-major, so each pollutant is contiguous
+    values[offsets[codes] + hours - first[codes]] = data[pollutants].to_numpy(dtype=np.float64)
+    start = grid_hours.min() if len(rows) else 0
+    hour_level = pd.DatetimeIndex(np.arange(start, grid_hours.max() + 1 if len(rows) else 0).astype('datetime64[h]').astype('datetime64[ns]'))
+    index = pd.MultiIndex(levels=[stations, hour_level], codes=[rows, grid_hours - start], names=['station', 'datetime'], verify_integrity=False)
+    return index, values, offsets[rows]
+
+def rolling_means(data:pd.DataFrame, hours:int=8, coverage:float=0.75, pollutants:list=POLLUTANTS) -> pd.DataFrame:
+    """
+    Computes the rolling mean of the last `hours` hours at every hour, for every station and pollutant at once
+    Each window is a difference of cumulative sums of readings and of reading counts, so the cost does not depend on the
+    window length. Missing hours (including those before a station's first reading) count towards the window but not the
+    mean; windows with less than `coverage` of their hours present are NaN
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        hours (int): window length in hours, default = 8
+        coverage (float): fraction of readings a window needs, default = 0.75
+        pollutants (list): selected pollutants, default = POLLUTANTS
+    Returns:
+        means (DataFrame): indexed by (station, datetime) on a complete hourly grid, with a column per pollutant
+    """
+    index, values, starts = _hourly_grid(data, pollutants)
+    rows = np.arange(len(values))
+    clipped = np.nonzero(rows + 1 - hours < starts)[0]                # Windows that would reach into the previous station
+    means = np.full(values.shape, np.nan, order='F')
+    for column in range(len(pollutants)):
+        present = ~np.isnan(values[:, column])
+        window_sums, window_counts = (np.concatenate(([0], np.cumsum(running))) for running in (np.where(present, values[:, column], 0), present))
+        for totals in (window_sums, window_counts):                   # Window total = running total at its end - at its start
+            lagged = np.empty(len(values), dtype=totals.dtype)
+            lagged[hours - 1:] = totals[:max(len(values) - hours + 1, 0)]   # Empty when the grid is shorter than a window
+            lagged[clipped] = totals[starts[clipped]]
+            totals[1:] -= lagged
+        enough = window_counts[1:] >= coverage * hours
+        np.divide(window_sums[1:], window_counts[1:], out=means[:, column], where=enough)
+    return pd.DataFrame(means, index=index, columns=pollutants)
+
+def exceedances(data:pd.DataFrame, limits:dict=LIMIT_VALUES, coverage:float=0.75, freq:str=None) -> pd.DataFrame:
+    """
+    Counts the days on which each limit value is exceeded, for every station and pollutant at once
+    A limit averaged over 'D' is compared with the daily mean (01:00 to 24:00), and one averaged over n hours with the
+    highest rolling n-hour mean ending in the day (see: rolling_means)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        limits (dict): pollutant -> (averaging period, limit), default = LIMIT_VALUES
+        coverage (float): fraction of readings an average needs, default = 0.75
+        freq (str): pandas period frequency to count over (e.g. 'Y' or 'M'), default = None (whole record)
+    Returns:
+        exceedance_table (DataFrame): number of days exceeding each limit, indexed by station (and period), with a column per pollutant
+    """
+    counts = {}
+    for period in dict.fromkeys(averaging for averaging, _ in limits.values()):
+        pollutants = [pollutant for pollutant, (averaging, _) in limits.items() if averaging == period]
+        means = rolling_means(data, 24 if period == 'D' else period, coverage, pollutants)
+        times = means.index.get_level_values('datetime')
+        days = (times - pd.Timedelta(hours=1)).floor('D')
+        if period == 'D':
+            means = means[times.hour == 0]                               # Window ending at 24:00 covers the day
+            days = days[times.hour == 0]
+        daily_peaks = means.groupby([means.index.get_level_values('station'), days.rename('day')]).max()
+        exceeded = daily_peaks > pd.Series({pollutant: limits[pollutant][1] for pollutant in pollutants})
+        groups = [exceeded.index.get_level_values('station')]
+        if freq is not None:
+            groups.append(exceeded.index.get_level_values('day').to_period(freq).rename('period'))
+        for pollutant, column in exceeded.groupby(groups).sum().items():
+            counts[pollutant] = column
+    return pd.DataFrame(counts)[[pollutant for pollutant in limits]]
+
 def count_missing_data(data:pd.DataFrame, monitoring_station:str, pollutant:str) -> int:
     """
     Counts 'No data' entries for a selected monitoring station and pollutant
@@ -166,4 +1104,214 @@ def fill_missing_data(data:pd.DataFrame, new_value, monitoring_station:str, poll
     """
     query = data.loc[monitoring_station]
     md_copy = query[pollutant].replace(np.NaN,new_value)     #Replace NaN values (see parse_data function) with new_value
-    return md_copy
\ No newline at end of file
+    return md_copy
+
+def _sorted_rows(data:pd.DataFrame) -> tuple:
+    """
+    Orders the rows of every station by time, stations one after another, without sorting when they already are
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+    Returns:
+        order (ndarray): row positions in that order, None if the rows are already in order
+        codes (ndarray): station code of every ordered row
+        hours (ndarray): reading hour of every ordered row (int64 hours since epoch)
+        firsts (ndarray): first ordered row of every station
+    """
+    station_codes = data.index.codes[data.index.names.index('station')]
+    level = data.index.names.index('datetime')
+    times, time_codes = data.index.levels[level], data.index.codes[level]
+    codes = station_codes.astype(np.int64)
+    hours = times.to_numpy().astype('datetime64[h]').astype(np.int64)[time_codes]
+    in_order = not len(hours)
+    if times.is_monotonic_increasing and not in_order:                 # Time codes are in time order, and cheaper to compare
+        station_steps, time_steps = np.diff(station_codes), np.diff(time_codes)
+        in_order = not np.any(station_steps < 0) and not np.any((station_steps == 0) & (time_steps < 0))
+    order = None
+    if not in_order:
+        order = np.argsort(codes * (hours.max() - hours.min() + 1) + (hours - hours.min()), kind='stable')
+        codes, hours = codes[order], hours[order]
+    firsts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.zeros(0, dtype=np.int64)
+    return order, codes, hours, firsts
+
+def _gap_hours(hours:np.ndarray, valid:np.ndarray, firsts:np.ndarray) -> tuple:
+    """
+    Finds the runs of hours without a reading of one pollutant, from each station's first to its last row (see: gap_runs).
+    The hours of the readings are listed with each station's first row - 1 and last row + 1 as bounds, and a run is every
+    step of more than one hour between neighbours of the same station
+
+    Arguments:
+        hours (ndarray): reading hour of every row, rows sorted by station then time (see: _sorted_rows)
+        valid (ndarray): True where the row has a reading
+        firsts (ndarray): first row of every station
+    Returns:
+        stations (ndarray): station (position in firsts) of every run
+        starts (ndarray): first missing hour of every run
+        lengths (ndarray): hours in every run
+    """
+    if not len(firsts):
+        return firsts, hours[:0], hours[:0]
+    lasts = np.r_[firsts[1:], len(hours)] - 1
+    ends = np.cumsum(np.add.reduceat(valid, firsts, dtype=np.int64))   # Readings up to the end of each station
+    positions = np.column_stack((np.r_[0, ends[:-1]], ends)).ravel()
+    merged = np.insert(hours[valid], positions, np.column_stack((hours[firsts] - 1, hours[lasts] + 1)).ravel())
+    steps = np.diff(merged)
+    bounds = np.arange(len(firsts)) * 2
+    steps[(ends + bounds + 1)[:-1]] = 0                               # From one station's last bound to the next station's first
+    gaps = np.flatnonzero(steps > 1)
+    return np.searchsorted(np.r_[0, ends[:-1]] + bounds, gaps, side='right') - 1, merged[gaps] + 1, steps[gaps] - 1
+
+def _hour_times(hours:np.ndarray) -> pd.DatetimeIndex:
+    """
+    Converts int64 hours since epoch to timestamps
+    """
+    return pd.DatetimeIndex(hours.astype('datetime64[h]').astype('datetime64[ns]'))
+
+def gap_runs(data:pd.DataFrame, pollutants:list=POLLUTANTS) -> pd.DataFrame:
+    """
+    Lists every run of consecutive missing hours ('No data' entries or absent rows) for every station and pollutant
+    Runs are found from one mask of the readings per pollutant (see: _gap_hours), and never span two stations
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        pollutants (list): selected pollutants, default = POLLUTANTS
+    Returns:
+        runs (DataFrame): one row per run, with station, pollutant, start and end (first and last missing hour) and hours columns
+    """
+    order, codes, hours, firsts = _sorted_rows(data)
+    stations = data.index.levels[data.index.names.index('station')]
+    runs = []
+    for pollutant in pollutants:
+        values = data[pollutant].to_numpy()
+        valid = ~np.isnan(values if order is None else values[order])
+        run_stations, starts, lengths = _gap_hours(hours, valid, firsts)
+        runs.append(pd.DataFrame({'station': pd.Categorical.from_codes(codes[firsts][run_stations], stations), 'pollutant': pollutant,
+                                  'start': _hour_times(starts), 'end': _hour_times(starts + lengths - 1), 'hours': lengths}))
+    return pd.concat(runs, ignore_index=True)
+
+def missing_profile(data:pd.DataFrame, pollutants:list=POLLUTANTS) -> pd.DataFrame:
+    """
+    Profiles missing data of every station and pollutant at once (see: gap_runs):
+
+        missing: number of missing hours
+        coverage: fraction of hours with a reading, between the station's first and last reading
+        gaps: number of runs of missing hours
+        longest: length of the longest run in hours
+        longest_start: first missing hour of the longest run (earliest if tied)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data
+        pollutants (list): selected pollutants, default = POLLUTANTS
+    Returns:
+        profile (DataFrame): indexed by station, with columns (pollutant, statistic)
+    """
+    order, codes, hours, firsts = _sorted_rows(data)
+    size = len(firsts)
+    lasts = np.r_[firsts[1:], len(hours)][:len(firsts)] - 1
+    span = hours[lasts] - hours[firsts] + 1                         # Hours from each station's first to last row
+    profile = {}
+    for pollutant in pollutants:
+        values = data[pollutant].to_numpy()
+        valid = ~np.isnan(values if order is None else values[order])
+        run_stations, starts, lengths = _gap_hours(hours, valid, firsts)
+        missing = np.bincount(run_stations, weights=lengths, minlength=size).astype(np.int64)
+        longest = np.zeros(size, dtype=np.int64)
+        np.maximum.at(longest, run_stations, lengths)
+        longest_start = np.full(size, np.datetime64('NaT'), dtype='datetime64[ns]')
+        tied = np.flatnonzero(lengths == longest[run_stations])     # Runs are in time order, so the first is the earliest
+        longest_stations, earliest = np.unique(run_stations[tied], return_index=True)
+        longest_start[longest_stations] = _hour_times(starts[tied[earliest]])
+        profile.update({(pollutant, 'missing'): missing, (pollutant, 'coverage'): 1 - missing / span,
+                        (pollutant, 'gaps'): np.bincount(run_stations, minlength=size),
+                        (pollutant, 'longest'): longest, (pollutant, 'longest_start'): longest_start})
+    stations = data.index.levels[data.index.names.index('station')][codes[firsts]]
+    profile = pd.DataFrame(profile, index=pd.Index(stations, name='station'))
+    profile.columns.names = ['pollutant', None]
+    return profile
+
+def _fill_values(times:np.ndarray, values:np.ndarray, breaks:np.ndarray, method:str, limit) -> tuple:
+    """
+    Computes fill values for the runs of missing readings of one pollutant, with rows sorted by station then time.
+    Each run is filled from the readings either side of it, found from one mask of the missing rows
+
+    Arguments:
+        times (ndarray): reading hours (int64 hours since epoch)
+        values (ndarray): readings, NaN when missing
+        breaks (ndarray): True on the first row of every station
+        method (str): 'ffill' (last reading within limit hours) or 'interpolate' (linear in time, gaps of at most limit hours)
+        limit (int): see method, None for no limit
+    Returns:
+        rows (ndarray): missing rows
+        filled (ndarray): fill value of every missing row, NaN where no value applies
+    """
+    missing = np.isnan(values)
+    rows = np.flatnonzero(missing)
+    run_starts = (missing & (breaks | ~np.r_[False, missing[:-1]]))[rows]    # First missing row of each run
+    run = np.cumsum(run_starts) - 1                                   # Run of every missing row
+    heads = np.flatnonzero(run_starts)
+    first, last = rows[heads], rows[np.r_[heads[1:], len(rows)][:len(heads)] - 1]
+    has_previous = ~breaks[first]
+    has_following = ~np.append(breaks, True)[last + 1]              # A station's last row has no following reading
+    previous, following = np.maximum(first - 1, 0), np.minimum(last + 1, len(values) - 1)
+    if method == 'ffill':
+        usable = has_previous[run]
+        if limit is not None:
+            usable &= times[rows] - times[previous][run] <= limit
+        return rows, np.where(usable, values[previous][run], np.nan)
+
+    usable = has_previous & has_following
+    if limit is not None:
+        usable &= times[following] - times[previous] - 1 <= limit
+    weight = (times[rows] - times[previous][run]) / (times[following] - times[previous])[run]
+    filled = values[previous][run] + (values[following] - values[previous])[run] * weight
+    return rows, np.where(usable[run], filled, np.nan)
+
+def fill_gaps(data:pd.DataFrame, method:str='interpolate', limit:int=None, pollutants:list=POLLUTANTS) -> pd.Series:
+    """
+    Fills 'No data' entries of every station and pollutant in place, using one of:
+
+        'ffill': the last reading of the station, if at most limit hours earlier
+        'interpolate': linear interpolation in time between the readings either side, for gaps of at most limit hours
+        'seasonal': the station's mean for the same month and hour of day
+
+    Fill values are computed for the missing rows only, from the runs of one mask per pollutant (see: _fill_values), and
+    written back with one positional assignment per pollutant, so the data is not copied. Cached aggregates are cleared (see: clear_aggregates)
+
+    Arguments:
+        data (DataFrame): time-indexed pollutant data, modified in place
+        method (str): 'ffill', 'interpolate' or 'seasonal', default = 'interpolate'
+        limit (int): hours limit of 'ffill' and 'interpolate', default = None (no limit)
+        pollutants (list): selected pollutants, default = POLLUTANTS
+    Returns:
+        filled (Series): number of entries filled for each pollutant
+    """
+    if method not in ('ffill', 'interpolate', 'seasonal'):
+        raise ValueError(f"unknown method '{method}'")
+    order, codes, times, firsts = _sorted_rows(data)                  # Rows by station, then time
+    breaks = np.zeros(len(codes), dtype=bool)
+    breaks[firsts] = True
+    if method == 'seasonal':
+        start = _hour_times(times) - pd.Timedelta(hours=1)
+        groups = (codes * 12 + start.month.to_numpy() - 1) * 24 + start.hour.to_numpy()    # (station, month, hour of day)
+
+    filled = {}
+    for pollutant in pollutants:
+        column = data.columns.get_loc(pollutant)
+        values = data[pollutant].to_numpy()
+        values = values if order is None else values[order]
+        if method == 'seasonal':
+            missing = np.isnan(values)
+            size = len(data.index.levels[data.index.names.index('station')]) * 12 * 24
+            sums = np.bincount(groups[~missing], weights=values[~missing], minlength=size)
+            counts = np.bincount(groups[~missing], minlength=size)
+            means = np.divide(sums, counts, out=np.full(size, np.nan), where=counts > 0)
+            rows = np.flatnonzero(missing)
+            fill = means[groups[rows]]
+        else:
+            rows, fill = _fill_values(times, values, breaks, method, limit)
+        usable = ~np.isnan(fill)
+        positions = rows[usable] if order is None else order[rows[usable]]
+        data.iloc[positions, column] = fill[usable]
+        filled[pollutant] = len(positions)
+    clear_aggregates()
+    return pd.Series(filled, name='filled')
@@ -1,157 +1,376 @@
-def sumvalues(values: list)-> int or float:
+import array as array_module
+import bisect
+import collections
+import heapq
+import numbers
+import numpy as np
+
+def _is_number_type(kind:type) -> bool:
+    """
+    Checks whether a type is a real number type accepted by summary_stats (Python or NumPy int/float, not bool)
     """
-    Calculates the sum of all numbers in a list.
+    return issubclass(kind, numbers.Real) and not issubclass(kind, (bool, np.bool_))
+
+def summary_stats(values) -> dict:
+    """
+    Calculates the count, sum, mean, smallest and largest number (and their indices) of a list in one call.
+    Lists, tuples, array.array and NumPy arrays are accepted; numbers are read into an array (without copying
+    array.array or ndarrays) and reduced with vectorised NumPy operations. Integers too large for an array
+    fall back to a single loop that checks, adds and compares each value once.
+
+    As with a comparison loop starting at the first value, NaN is never smaller or larger than another number:
+    NaNs are skipped by argmin and argmax, unless the first value is NaN (then both are 0).
 
     Arguments:
-        values (list): list of numbers
+        values (list | tuple | array.array | ndarray): flat sequence of real numbers (Python or NumPy, not bool)
     Returns:
-        sum (int | float): sum of all numbers
+        stats (dict): count, sum, mean, min, max, argmin (index of first smallest) and argmax (index of first largest),
+                      or None if values is empty
     Raises:
         TypeError: Non-numerical elements found in list
     """
-    try:
-        if values == []:    # Returns none if list is empty
+    if isinstance(values, (list, tuple)):
+        types = set(map(type, values))
+        if not all(_is_number_type(kind) for kind in types):
+            raise TypeError("Non-numerical elements found in list")    # Also rejects bools, strings and nested lists
+        if types and all(issubclass(kind, numbers.Integral) for kind in types):
+            try:
+                array = np.asarray(values, dtype=np.int64)
+            except OverflowError:
+                array = np.asarray(values, dtype=object)    # Integers beyond int64 stay Python ints, added exactly below
+        else:
+            array = np.asarray(values)
+    else:
+        array = np.asarray(values)
+    if array.ndim != 1 or array.dtype.kind not in 'iufO':
+        if array.size == 0:
             return None
-        elif all(type(n) in (int, float) for n in values):    # Checks if there are any non-numerical values
-            sum = 0
-            for i in values:
-                sum = sum + i
+        raise TypeError("Non-numerical elements found in list")
+    if array.size == 0:    # Returns none if list is empty
+        return None
+    if array.dtype.kind in 'iuf':    # Vectorised reductions over the whole array
+        if array.dtype.kind == 'f' and np.isnan(array[0]):
+            argmin = argmax = 0
+        elif array.dtype.kind == 'f':
+            argmin, argmax = int(np.nanargmin(array)), int(np.nanargmax(array))
         else:
-            raise TypeError ("Non-numerical elements found in list")
-    except TypeError as e:
-        print(e)
-    return sum
+            argmin, argmax = int(array.argmin()), int(array.argmax())
+        smallest, largest = array[argmin].item(), array[argmax].item()
+        if array.dtype.kind in 'iu' and max(abs(smallest), abs(largest)) * array.size >= 2**63:
+            total = sum(array.tolist())    # Integer sum could overflow int64, so add exactly
+        else:
+            total = array.sum().item()
+        return {'count': array.size, 'sum': total, 'mean': total / array.size,
+                'min': smallest, 'max': largest, 'argmin': argmin, 'argmax': argmax}
 
-def maxvalue(values: list)-> int:
+    total = 0
+    smallest = largest = None
+    argmin = argmax = 0
+    for i, n in enumerate(array.tolist()):    # Checks, adds and compares each value once
+        if not _is_number_type(type(n)):
+            raise TypeError("Non-numerical elements found in list")
+        total = total + n
+        if smallest is None or n < smallest:
+            smallest, argmin = n, i
+        if largest is None or n > largest:
+            largest, argmax = n, i
+    return {'count': array.size, 'sum': total, 'mean': total / array.size,
+            'min': smallest, 'max': largest, 'argmin': argmin, 'argmax': argmax}
+
+def _summary_value(values, key:str):
     """
-    Finds the index of the largest number in a list.
+    Returns one statistic of a list (see: summary_stats), printing the error and returning None for non-numerical lists
 
     Arguments:
-        values (list): list of numbers
+        values (list | tuple | array.array | ndarray): sequence of numbers
+        key (str): name of statistic
     Returns:
-        index (int): index of largest number
-    Raises:
-        TypeError: Non-numerical elements found in list
+        value: statistic, or None if values is empty or not numerical
     """
     try:
-        if values == []:    # Returns none if list is empty
-            return None
-        elif all(type(n) in (int, float) for n in values):    # Checks if there are any non-numerical values
-            index = 0
-            largest = values[0]     # Holds the largest element when iterating over a list. Default value = first element
-            for i in range(len(values)):
-                if values[i] > largest:
-                    index = i
-                    largest = values[i]
-        else:
-            raise TypeError ("Non-numerical elements found in list")
+        stats = summary_stats(values)
     except TypeError as e:
         print(e)
-    return index
+        return None
+    return None if stats is None else stats[key]
+
+def sumvalues(values: list)-> int or float:
+    """
+    Calculates the sum of all numbers in a list (see: summary_stats).
+
+    Arguments:
+        values (list | array.array | ndarray): list of numbers
+    Returns:
+        sum (int | float): sum of all numbers, None if the list is empty or has non-numerical elements
+    Outputs:
+        prints 'Non-numerical elements found in list' if there are non-numerical elements
+    """
+    return _summary_value(values, 'sum')
+
+def maxvalue(values: list)-> int:
+    """
+    Finds the index of the largest number in a list (see: summary_stats).
+
+    Arguments:
+        values (list | array.array | ndarray): list of numbers
+    Returns:
+        index (int): index of largest number (first if tied), None if the list is empty or has non-numerical elements
+    Outputs:
+        prints 'Non-numerical elements found in list' if there are non-numerical elements
+    """
+    return _summary_value(values, 'argmax')
 
 def minvalue(values: list)-> int:
     """
-    Finds the index of the smallest number in a list.
+    Finds the index of the smallest number in a list (see: summary_stats).
 
     Arguments:
-        values (list): list of numbers
+        values (list | array.array | ndarray): list of numbers
     Returns:
-        index (int): index of smallest number
-    Raises:
-        TypeError: Non-numerical elements found in list
+        index (int): index of smallest number (first if tied), None if the list is empty or has non-numerical elements
+    Outputs:
+        prints 'Non-numerical elements found in list' if there are non-numerical elements
     """
-    try:
-        if values == []:    # Returns none if list is empty
-            return None
-        elif all(type(n) in (int, float) for n in values):    # Checks if there are any non-numerical values
-            index = 0
-            smallest = values[0]     # Holds the smallest element when iterating over a list. Default value = first element
-            for i in range(len(values)):
-                if values[i] < smallest:
-                    index = i
-                    smallest = values[i]
-        else:
-            raise TypeError("Non-numerical elements found in list")
-    except TypeError as e:
-        print(e)
-    return index
+    return _summary_value(values, 'argmin')
 
 def meannvalue(values: list)-> int or float:
     """
-    Calculates the mean of all numbers in a list.
+    Calculates the mean of all numbers in a list (see: summary_stats).
 
     Arguments:
-        values (list): list of numbers
+        values (list | array.array | ndarray): list of numbers
     Returns:
-        mean (int | float): sum of all numbers
-    Raises:
-        TypeError: Non-numerical elements found in list
+        mean (int | float): mean of all numbers, None if the list is empty or has non-numerical elements
+    Outputs:
+        prints 'Non-numerical elements found in list' if there are non-numerical elements
     """
-    try:
-        if values == []:    # Returns none if list is empty
-            return None
-        if all(type(n) in (int, float) for n in values):    # Checks if there are any non-numerical values
-            sum = 0
-            for i in values:
-                sum = sum + i
-            mean = sum / len(values) #Divides sum of list by number of elements in list
-        else:
-            raise TypeError ("Non-numerical elements found in list")
-    except TypeError as e:
-        print(e)
-    return mean
+    return _summary_value(values, 'mean')
     
+def histogram(values, targets=None) -> dict:
+    """
+    Counts the occurences of every distinct value in a list, or of each of a set of target values, in one pass
+        Integer arrays are counted with np.bincount (or np.unique when the values are spread over a wide range),
+        other numeric arrays with np.unique, and other lists with a dictionary counter (collections.Counter)
+
+    Arguments:
+        values (list | array.array | ndarray): list of elements
+        targets (list): values to count, default = None (every distinct value)
+    Returns:
+        counts (dict): value -> number of occurences (0 for targets that do not occur)
+    """
+    array = _numeric_array(values)
+    if array is None:
+        counts = collections.Counter(values)
+    elif array.dtype.kind in 'iu' and len(array) and int(array.max()) - int(array.min()) <= 2 * len(array) + 1024:
+        smallest = int(array.min())
+        bins = np.bincount((array - smallest).astype(np.intp, copy=False))
+        present = np.nonzero(bins)[0]
+        counts = dict(zip((present + smallest).tolist(), bins[present].tolist()))
+    else:
+        distinct, occurs = np.unique(array, return_counts=True)
+        counts = dict(zip(distinct.tolist(), occurs.tolist()))
+    if targets is None:
+        return dict(counts)
+    return {target: counts.get(target, 0) for target in targets}
+
 def countvalue(values: list, x)-> int:
     """
-    Finds the number of occurences of a target value x in a list
+    Finds the number of occurences of a target value x in a list (see: histogram)
+    To count several targets, call histogram once instead of countvalue for each target
 
     Arguments:
-        values (list): list of elements
+        values (list | array.array | ndarray): list of elements
         x: target value
     Returns:
         occurs (int): number of occurences of x
     """
-    occurs = 0  
-    for i in values:    # Counts the number of occurences of x
-        if x == i:
-            occurs = occurs + 1
-    return occurs
+    array = _numeric_array(values)
+    if array is not None and isinstance(x, (int, float, np.number)):
+        return int(np.count_nonzero(array == x))    # One vectorised comparison
+    try:
+        return histogram(values, [x])[x]
+    except TypeError:    # Unhashable values or target: compares each element
+        occurs = 0
+        for i in values:
+            if x == i:
+                occurs = occurs + 1
+        return occurs
+
+INSERTION_RUN = 64    # Length of the runs sorted by insertion before merging (see: mergesort)
+
+def _numeric_array(values):
+    """
+    Returns a NumPy view of a numeric ndarray or array.array (sharing its memory), or None for other sequences
+
+    Arguments:
+        values: sequence of elements
+    Returns:
+        array (ndarray | None): view of values
+    """
+    if isinstance(values, np.ndarray):
+        array = values
+    elif isinstance(values, array_module.array):
+        array = np.asarray(memoryview(values))
+    else:
+        return None
+    return array if array.ndim == 1 and array.dtype.kind in 'biuf' else None
+
+def _insertion_runs(keys:list, items, width:int, reverse:bool):
+    """
+    Sorts the list in place in runs of length width by binary insertion (bisect), keeping the order of equal keys
+    A run sorted from largest to smallest is the reverse of its reversed elements sorted from smallest to largest
+
+    Arguments:
+        keys (list): keys to sort
+        items (list | None): elements belonging to the keys, None if the keys are the elements
+        width (int): length of the runs
+        reverse (bool): sort runs from largest to smallest
+    """
+    for start in range(0, len(keys), width):
+        end = min(start + width, len(keys))
+        order = range(end - 1, start - 1, -1) if reverse else range(start, end)
+        run_keys, run_items = [], []
+        for i in order:
+            position = bisect.bisect_right(run_keys, keys[i])
+            run_keys.insert(position, keys[i])
+            if items is not None:
+                run_items.insert(position, items[i])
+        keys[start:end] = run_keys[::-1] if reverse else run_keys
+        if items is not None:
+            items[start:end] = run_items[::-1] if reverse else run_items
+
+def _merge_pass(source_keys:list, source_items, target_keys:list, target_items, width:int, reverse:bool):
+    """
+    Merges every pair of neighbouring sorted runs of length width from the source lists into the target lists
+    Equal keys keep their order (the left run's element is placed first)
+
+    Arguments:
+        source_keys (list): keys, sorted in runs of length width
+        source_items (list | None): elements belonging to the keys, None if the keys are the elements
+        target_keys (list): list of the same length receiving the runs of length 2 x width
+        target_items (list | None): list receiving the elements, None if the keys are the elements
+        width (int): length of the sorted runs
+        reverse (bool): runs are sorted from largest to smallest
+    """
+    n = len(source_keys)
+    for start in range(0, n, 2 * width):
+        i, middle = start, min(start + width, n)
+        j, end = middle, min(start + 2 * width, n)
+        k = start
+        if middle < end:
+            left, right = source_keys[i], source_keys[j]            # Heads of the two runs
+            while True:                                             # Places the smaller (larger if reverse) head first
+                if (left < right) if reverse else (right < left):
+                    target_keys[k] = right
+                    if source_items is not None:
+                        target_items[k] = source_items[j]
+                    k = k + 1
+                    j = j + 1
+                    if j == end:
+                        break
+                    right = source_keys[j]
+                else:
+                    target_keys[k] = left
+                    if source_items is not None:
+                        target_items[k] = source_items[i]
+                    k = k + 1
+                    i = i + 1
+                    if i == middle:
+                        break
+                    left = source_keys[i]
+        for first, last in ((i, middle), (j, end)):                 # Copies whatever is left of either run
+            target_keys[k:k + last - first] = source_keys[first:last]
+            if source_items is not None:
+                target_items[k:k + last - first] = source_items[first:last]
+            k = k + last - first
+
+def mergesort(values, key=None, reverse:bool=False):
+    """
+    Sorts a list in place from smallest to largest value (largest to smallest if reverse), keeping the order of equal elements
+        Uses the bottom-up merge-sort algorithm: sorts short runs by binary insertion, then merges runs of doubling length
+        back and forth between the list and a single scratch list, so there is no recursion and no copying of subarrays
+        Numeric NumPy arrays and array.array are sorted in place by NumPy instead
+
+    Arguments:
+        values (list | array.array | ndarray): list of elements
+        key (function): function giving the value to compare for each element, default = None (the elements themselves)
+        reverse (bool): sort from largest to smallest, default = False
+    Returns:
+        values (list | array.array | ndarray): the same list, sorted
+    """
+    array = _numeric_array(values) if key is None else None
+    if array is not None:
+        array.sort(kind='stable')
+        if reverse:
+            array[:] = array[::-1].copy()
+        return values
+
+    if key is None:                                                 # Elements are their own keys
+        source, target = (values, None), ([None] * len(values), None)
+    else:
+        source, target = ([key(element) for element in values], values), ([None] * len(values), [None] * len(values))
+    width = INSERTION_RUN
+    _insertion_runs(*source, width, reverse)
+    while width < len(values):
+        _merge_pass(*source, *target, width, reverse)
+        source, target = target, source
+        width = width * 2
+    result = source[0] if key is None else source[1]
+    if result is not values:                                        # Result ended in the scratch list
+        values[:] = result
+    return values
+
+def nsmallest(values, k:int, key=None) -> list:
+    """
+    Returns the k smallest elements of a list from smallest to largest, without sorting the whole list
+        Numeric arrays are partitioned by NumPy; other lists use a heap of k elements
+
+    Arguments:
+        values (list | array.array | ndarray): list of elements
+        k (int): number of elements
+        key (function): function giving the value to compare for each element, default = None (the elements themselves)
+    Returns:
+        smallest (list): k smallest elements (all of them if k >= len(values))
+    """
+    array = _numeric_array(values) if key is None else None
+    if array is None:
+        return heapq.nsmallest(k, values, key=key)
+    k = max(0, min(k, len(array)))
+    if k == 0:
+        return []
+    smallest = np.partition(array, k - 1)[:k] if k < len(array) else array.copy()
+    smallest.sort(kind='stable')
+    return smallest.tolist()
+
+def nlargest(values, k:int, key=None) -> list:
+    """
+    Returns the k largest elements of a list from largest to smallest, without sorting the whole list (see: nsmallest)
+
+    Arguments:
+        values (list | array.array | ndarray): list of elements
+        k (int): number of elements
+        key (function): function giving the value to compare for each element, default = None (the elements themselves)
+    Returns:
+        largest (list): k largest elements (all of them if k >= len(values))
+    """
+    array = _numeric_array(values) if key is None else None
+    if array is None:
+        return heapq.nlargest(k, values, key=key)
+    k = max(0, min(k, len(array)))
+    if k == 0:
+        return []
+    largest = np.partition(array, len(array) - k)[len(array) - k:] if k < len(array) else array.copy()
+    largest.sort(kind='stable')
+    return largest[::-1].tolist()
 
 def sorted(values:list) -> list:
     """
-    Sorts the list from smallest to largest value
-        Uses the merge-sort algorithm: Divides list into subarrays and sorts by comparison across subarrays
+    Sorts the list from smallest to largest value, in place (see: mergesort)
+    Kept for existing callers; note that it shadows the builtin sorted within this module
 
     Arguments:
         values (list): list of elements
     Returns:
         values (list): sorted list
     """
-    if len(values) > 1:                                 
-        centre = len(values) // 2
-        left = values[:centre]
-        right = values[centre:]
-
-        sorted(left)                                    # Recursive call breaks down the current left and right arrays into their own halves (until one element left)
-        sorted(right)
-        i = j = k = 0
-
-        while i < len(left) and j < len(right):         # Compares values in order across left and right array, places smallest value in values array first
-            if left[i] < right[j]:                  
-                values[k] = left[i]
-                i = i + 1
-            else:
-                values[k] = right[j]
-                j = j + 1
-            k = k + 1
-        
-        while i < len(left):                        # Places remaining elements in left array if all values in right array have been placed                        
-            values[k] = left[i]
-            i = i + 1
-            k = k + 1
-        
-        while j < len(right):                       # Places remaining elements in right array if all values in left array have been placed 
-            values[k] = right[j]
-            j = j + 1
-            k = k + 1
-    return values
+    return mergesort(values)